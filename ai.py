@@ -1,65 +1,85 @@
-import os
-import groq
-from dotenv import load_dotenv
-
-# ✅ Load environment variables
-load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-if not GROQ_API_KEY:
-    raise ValueError("Missing GROQ_API_KEY! Please set it in .env.")
-
-# ✅ Initialize AI client
-client = groq.Client(api_key=GROQ_API_KEY)
+import time
+import llm_async
+import metrics
+import prompt_builder
+import response_cache
+import retrieval
+from llm_client import LLM_MODEL
 
+@metrics.timed("ai.get_ai_explanation")
 def get_ai_explanation(user_input, pdf_text=""):
     """Generates an AI response using the GROQ API."""
-    
-    prompt = "You are an AI tutor. Answer clearly and concisely."
-    
-    if pdf_text:
-        prompt += f"\nUse the following document as reference:\n{pdf_text[:2000]}"
-    
-    response = client.chat.completions.create(
-        model="llama3-8b-8192",
-        messages=[
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": user_input}
-        ]
-    )
-    
-    return response.choices[0].message.content.strip()
+    return llm_async.complete(build_messages(user_input, pdf_text))
+
+def build_messages(user_input, context="", history=None, summary="", doc_hash=None):
+    """Builds the chat messages for a question, packing reference text and recent turns into the token budget."""
+    return prompt_builder.build_messages(user_input, context, history, summary, doc_hash=doc_hash)
+
+def _cacheable(history, summary, context):
+    # Follow-up questions depend on the conversation, so only standalone questions are cached
+    if history or summary:
+        return False
+    # Answers drawn from the shared corpus change as documents are uploaded, so they are not cached either
+    return bool(context.strip()) or not retrieval.RAG_CORPUS_FALLBACK
 
 # ✅ Test the AI response
-def get_response(user_input, context=""):
-    """Generates an AI response based on user input and optional context (like a PDF)."""
+@metrics.timed("ai.get_response")
+def get_response(user_input, context="", history=None, summary="", doc_hash=None):
+    """Generates an AI response based on user input, optional context (like a PDF) and earlier turns.
+
+    doc_hash identifies an uploaded document, so its embeddings are keyed by the document, not its text.
+    """
     
-    prompt = "You are an AI tutor. Answer clearly and concisely."
-    if context:
-        prompt += f"\nUse the following reference:\n{context[:2000]}"
+    # ✅ Serve repeated questions about the same document from the cache
+    cacheable = _cacheable(history, summary, context)
+    if cacheable:
+        cached = response_cache.lookup(user_input, LLM_MODEL, context)
+        if cached is not None:
+            return cached
 
-    response = client.chat.completions.create(
-        model="llama3-8b-8192",
-        messages=[
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": user_input}
-        ]
-    )
+    answer = llm_async.complete(build_messages(user_input, context, history, summary, doc_hash))
+    if cacheable:
+        response_cache.store(user_input, LLM_MODEL, context, answer)
+    return answer
 
-    return response.choices[0].message.content.strip()
+def stream_response(user_input, context="", history=None, summary="", doc_hash=None):
+    """Yields the AI response piece by piece as tokens arrive from the API."""
+    cacheable = _cacheable(history, summary, context)
+    if cacheable:
+        cached = response_cache.lookup(user_input, LLM_MODEL, context)
+        if cached is not None:
+            yield cached
+            return
 
-def get_quiz_questions(pdf_text):
+    messages = build_messages(user_input, context, history, summary, doc_hash)
+    with metrics.span("ai.stream_response", model=LLM_MODEL):
+        started = time.perf_counter()
+        parts = []
+        # ✅ Streams through llm_async, so chat shares the concurrency limits and request coalescing
+        for delta in llm_async.stream(messages):
+            if not parts:
+                metrics.observe("span_duration_seconds", time.perf_counter() - started,
+                                span="ai.stream_first_token", model=LLM_MODEL)
+            parts.append(delta)
+            yield delta
+
+    # ✅ Cache the full answer once the stream completes
+    answer = "".join(parts).strip()
+    # Streamed responses carry no usage block, so count tokens locally
+    metrics.inc("llm_tokens_total", sum(prompt_builder.message_tokens(m) for m in messages), model=LLM_MODEL, direction="in")
+    metrics.inc("llm_tokens_total", prompt_builder.count_tokens(answer), model=LLM_MODEL, direction="out")
+    if answer and cacheable:
+        response_cache.store(user_input, LLM_MODEL, context, answer)
+
+@metrics.timed("ai.get_quiz_questions")
+def get_quiz_questions(pdf_text, num_questions=5):
     """Fetches quiz questions from AI and ensures valid JSON format."""
+    excerpt = "\n\n".join(retrieval.representative_chunks(pdf_text))
     prompt = (
-        f"Generate exactly 5 multiple-choice questions from the following text:\n{pdf_text[:2000]}\n"
+        f"Generate exactly {num_questions} multiple-choice questions from the following text:\n{excerpt}\n"
         "Return a JSON array strictly in this format:\n"
         '[{"question": "What is AI?", "options": ["A) Artificial Intelligence", "B) Machine Learning", "C) Deep Learning", "D) Neural Networks"], "answer": "A) Artificial Intelligence"}]\n'
         "DO NOT add explanations, markdown, or extra text. Only return valid JSON."
     )
 
-    response = client.chat.completions.create(
-        model="llama3-8b-8192",
-        messages=[{"role": "system", "content": prompt}]
-    )
-
-    return response.choices[0].message.content.strip()
+    return llm_async.complete([{"role": "system", "content": prompt}])
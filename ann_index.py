@@ -0,0 +1,177 @@
+import os
+import tempfile
+import threading
+import numpy as np
+import faiss
+import database
+import embedding_store
+
+# ✅ Corpus-wide HNSW index settings (override through environment variables)
+ANN_INDEX_PATH = os.getenv("ANN_INDEX_PATH", os.path.join(".cache", "ann", "corpus.faiss"))
+HNSW_M = int(os.getenv("ANN_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("ANN_HNSW_EF_CONSTRUCTION", "80"))
+HNSW_EF_SEARCH = int(os.getenv("ANN_HNSW_EF_SEARCH", "64"))
+
+class CorpusIndex:
+    """HNSW graph over normalized chunk vectors; ids are assigned in insertion order."""
+
+    def __init__(self, dim, m=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, ef_search=HNSW_EF_SEARCH):
+        self.index = faiss.IndexHNSWFlat(dim, m, faiss.METRIC_INNER_PRODUCT)
+        self.index.hnsw.efConstruction = ef_construction
+        self.index.hnsw.efSearch = ef_search
+
+    @property
+    def dim(self):
+        return self.index.d
+
+    @property
+    def size(self):
+        return self.index.ntotal
+
+    def add(self, vectors):
+        """Inserts vectors and returns the id of the first one."""
+        start = self.index.ntotal
+        self.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        return start
+
+    def search(self, query_vectors, k):
+        """Returns (ids, scores) arrays of shape (n_queries, k); missing hits have id -1."""
+        queries = np.ascontiguousarray(np.atleast_2d(query_vectors), dtype=np.float32)
+        scores, ids = self.index.search(queries, k)
+        return ids, scores
+
+    @classmethod
+    def load(cls, path):
+        corpus = cls.__new__(cls)
+        corpus.index = faiss.read_index(path)
+        corpus.index.hnsw.efSearch = HNSW_EF_SEARCH
+        return corpus
+
+# ✅ Rewrite the on-disk snapshot after this many new chunks; newer chunks are replayed from the store
+ANN_SNAPSHOT_CHUNKS = int(os.getenv("ANN_SNAPSHOT_CHUNKS", "20000"))
+
+# Guards the process-local faiss object, which must not be searched while it is being added to
+_lock = threading.Lock()
+_corpus = None
+_snapshot_size = 0
+
+def _load_snapshot(next_id):
+    """Loads the last saved graph, unless it is ahead of the id table (e.g. the database was reset)."""
+    global _snapshot_size
+    if not os.path.exists(ANN_INDEX_PATH):
+        return None
+    corpus = CorpusIndex.load(ANN_INDEX_PATH)
+    if corpus.size > next_id:
+        return None
+    _snapshot_size = corpus.size
+    return corpus
+
+def _next_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM corpus_chunks").fetchone()[0]
+
+def _catch_up(conn):
+    """Brings the process-local index up to date with chunks other workers have added; call with _lock held.
+
+    Ids are assigned contiguously under the database write lock, so the chunks this process has not
+    seen are exactly the rows with id >= its index size. Their vectors are read from the embedding store
+    instead of reloading the whole graph.
+    """
+    global _corpus
+    if _corpus is None:
+        _corpus = _load_snapshot(_next_id(conn))
+    size = _corpus.size if _corpus is not None else 0
+    rows = conn.execute("SELECT doc_hash, chunk_index FROM corpus_chunks WHERE id >= ? ORDER BY id",
+                        (size,)).fetchall()
+    if not rows:
+        return _corpus
+
+    documents = {}
+    for doc_hash, _ in rows:
+        if doc_hash not in documents:
+            documents[doc_hash] = embedding_store.load_vectors(doc_hash)
+    if _corpus is None:
+        dims = [v.shape[1] for v in documents.values() if v is not None and v.ndim == 2]
+        if not dims:
+            return None
+        _corpus = CorpusIndex(dims[0])
+
+    vectors = np.zeros((len(rows), _corpus.dim), dtype=np.float32)
+    for i, (doc_hash, chunk_index) in enumerate(rows):
+        stored = documents[doc_hash]
+        # ✅ Pruned documents keep their ids with a zero vector; their chunk text is gone too, so they never surface
+        if stored is not None and chunk_index < len(stored) and stored.shape[1] == _corpus.dim:
+            vectors[i] = stored[chunk_index]
+    _corpus.add(vectors)
+    return _corpus
+
+def _save_snapshot(data):
+    os.makedirs(os.path.dirname(ANN_INDEX_PATH) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(ANN_INDEX_PATH) or ".", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data.tobytes())
+    os.replace(tmp_path, ANN_INDEX_PATH)
+
+def available():
+    """Returns True once at least one document has been added to the corpus index."""
+    with database.get_connection() as conn:
+        return conn.execute("SELECT 1 FROM corpus_chunks LIMIT 1").fetchone() is not None
+
+def contains(doc_hash):
+    """Returns True if the document's chunks are already in the corpus index."""
+    with database.get_connection() as conn:
+        row = conn.execute("SELECT 1 FROM corpus_chunks WHERE doc_hash = ? LIMIT 1", (doc_hash,)).fetchone()
+    return row is not None
+
+def add_document(doc_hash, vectors):
+    """Inserts a document's chunk vectors into the corpus index.
+
+    The id assignment runs under the database write lock (BEGIN IMMEDIATE), so concurrent workers
+    get disjoint id ranges. The graph file is only rewritten every ANN_SNAPSHOT_CHUNKS chunks.
+    """
+    global _corpus, _snapshot_size
+    if len(vectors) == 0 or contains(doc_hash):
+        return
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    snapshot = None
+    with _lock:
+        with database.transaction(immediate=True) as conn:
+            if conn.execute("SELECT 1 FROM corpus_chunks WHERE doc_hash = ? LIMIT 1", (doc_hash,)).fetchone():
+                return
+            corpus = _catch_up(conn)
+            if corpus is None:
+                # ✅ First document, or every earlier one was pruned: start a graph with this dimension
+                _corpus = CorpusIndex(vectors.shape[1])
+                corpus = _catch_up(conn)
+            start = _next_id(conn)
+            if corpus.dim != vectors.shape[1] or corpus.size != start:
+                return
+            conn.executemany("INSERT INTO corpus_chunks (id, doc_hash, chunk_index) VALUES (?, ?, ?)",
+                             [(start + i, doc_hash, i) for i in range(len(vectors))])
+        # ✅ Only after the ids are committed, so the local graph never holds vectors without rows
+        corpus.add(vectors)
+        if corpus.size - _snapshot_size >= ANN_SNAPSHOT_CHUNKS:
+            snapshot = faiss.serialize_index(corpus.index)
+            _snapshot_size = corpus.size
+    if snapshot is not None:
+        _save_snapshot(snapshot)
+
+def search(query_vector, k):
+    """Returns up to k (doc_hash, chunk_index, score) hits across every ingested document."""
+    with _lock:
+        with database.get_connection() as conn:
+            corpus = _catch_up(conn)
+        if corpus is None or corpus.size == 0:
+            return []
+        ids, scores = corpus.search(query_vector, k)
+
+    hits = [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i >= 0]
+    if not hits:
+        return []
+
+    placeholders = ",".join("?" * len(hits))
+    with database.get_connection() as conn:
+        rows = {row[0]: (row[1], row[2]) for row in conn.execute(
+            f"SELECT id, doc_hash, chunk_index FROM corpus_chunks WHERE id IN ({placeholders})",
+            [i for i, _ in hits])}
+    return [(*rows[i], score) for i, score in hits if i in rows]
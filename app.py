@@ -1,9 +1,6 @@
 import streamlit as st
-import chat
-import quiz
-import dashboard
 import login
-import database
+import metrics
 from utils import load_css
 
 # ✅ Ensure all required session state variables are initialized before anything else
@@ -19,32 +16,39 @@ if "quiz_started" not in st.session_state:
 if "quiz_finished" not in st.session_state:
     st.session_state["quiz_finished"] = False
 
-if "pdf_text" not in st.session_state:
-    st.session_state["pdf_text"] = ""
-
 if "authenticated" not in st.session_state:
     st.session_state["authenticated"] = False
 
+# ✅ Serve /metrics when METRICS_PORT is set (once per process)
+metrics.start_exporter()
+
 # ✅ Load custom CSS for styling
 load_css()
 
 # ✅ Ensure authentication before showing the app
 if not st.session_state["authenticated"]:
-    login.show_login()
+    with metrics.span("page.render", page="Login"):
+        login.show_login()
     st.stop()
 
 # ✅ Show the different sections of the app
+# Page modules (and their pandas/matplotlib/PyMuPDF/LLM dependencies) are imported only
+# when their page is opened, so a fresh worker reaches the login form quickly.
 st.sidebar.title("📌 Navigation")
 page = st.sidebar.radio("Go to:", ["Chat", "Quiz", "Dashboard"])
 
-if page == "Chat":
-    chat.chat_ui()
+with metrics.span("page.render", page=page):
+    if page == "Chat":
+        import chat
+        chat.chat_ui()
 
-elif page == "Quiz":
-    quiz.quiz_ui()
+    elif page == "Quiz":
+        import quiz
+        quiz.quiz_ui()
 
-elif page == "Dashboard":
-    dashboard.performance_dashboard()
+    elif page == "Dashboard":
+        import dashboard
+        dashboard.performance_dashboard()
 
 st.title("📚 AI Tutor with Adaptive Learning")
 
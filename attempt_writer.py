@@ -0,0 +1,133 @@
+import os
+import time
+import atexit
+import threading
+from datetime import datetime, timezone
+import database
+import metrics
+
+# ✅ Write-behind settings (override through environment variables)
+ATTEMPT_WRITE_BEHIND = os.getenv("ATTEMPT_WRITE_BEHIND", "0") == "1"
+# ✅ Flush once this many answers are queued, or once the oldest has waited this long
+ATTEMPT_FLUSH_SIZE = int(os.getenv("ATTEMPT_FLUSH_SIZE", "500"))
+ATTEMPT_FLUSH_INTERVAL = float(os.getenv("ATTEMPT_FLUSH_INTERVAL", "1.0"))
+
+def build_attempts(questions, answers):
+    """Pairs every question with the user's answer as (question, user_answer, correct_answer) rows.
+
+    Unanswered questions are stored with an empty answer so they count as incorrect.
+    """
+    return [(q["question"], answers[i] or "", q["answer"]) for i, q in enumerate(questions)]
+
+def _timestamp():
+    # Same format and timezone as SQLite's CURRENT_TIMESTAMP
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+class WriteBehindQueue:
+    """Buffers submitted quizzes and writes them in batches from a background thread.
+
+    A batch is flushed when it holds flush_size answers or its oldest entry is flush_interval
+    seconds old; every flush is a single transaction, however many quizzes it holds.
+    """
+
+    def __init__(self, flush_size=ATTEMPT_FLUSH_SIZE, flush_interval=ATTEMPT_FLUSH_INTERVAL):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._pending_answers = 0
+        self._oldest = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, result):
+        with self._cond:
+            self._pending.append(result)
+            self._pending_answers += max(1, len(result[3]))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="attempt-writer", daemon=True)
+                self._thread.start()
+            # ✅ Wake the writer on every submit: a full batch flushes now, and a first entry
+            # after a flush gives it a deadline again instead of waiting indefinitely
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _take(self):
+        with self._cond:
+            batch = self._pending
+            self._pending, self._pending_answers, self._oldest = [], 0, None
+            return batch
+
+    def _requeue(self, batch):
+        with self._cond:
+            self._pending[:0] = batch
+            self._pending_answers += sum(max(1, len(r[3])) for r in batch)
+            self._oldest = time.monotonic()
+
+    def flush(self):
+        """Writes everything queued so far; returns the number of quizzes written."""
+        with self._write_lock:
+            batch = self._take()
+            if not batch:
+                return 0
+            try:
+                database.save_quiz_results(batch)
+            except Exception:
+                # ✅ Keep the answers for the next flush instead of dropping them
+                self._requeue(batch)
+                raise
+            return len(batch)
+
+    def _due(self):
+        if not self._pending:
+            return False
+        return (self._pending_answers >= self.flush_size
+                or time.monotonic() - self._oldest >= self.flush_interval)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._due():
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self.flush_interval - (time.monotonic() - self._oldest))
+                    self._cond.wait(timeout)
+            try:
+                self.flush()
+            except Exception as e:
+                metrics.record_error("attempt_writer.flush")
+                print(f"[attempt_writer] Flush failed, retrying: {e}")
+                time.sleep(self.flush_interval)
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue():
+    """Returns the process-wide write-behind queue (flushed on interpreter exit)."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WriteBehindQueue()
+                atexit.register(_queue.flush)
+    return _queue
+
+def record_quiz(username, questions, answers, score, course=None, write_behind=None):
+    """Saves a submitted quiz: its score and every answer, correct or not, in one transaction.
+
+    answers[i] is the user's choice for questions[i] (None if skipped). With write-behind
+    enabled the quiz is queued and written together with other submissions.
+    """
+    result = (username, score, len(questions), build_attempts(questions, answers), _timestamp(),
+              database.normalize_course(course))
+    if write_behind is None:
+        write_behind = ATTEMPT_WRITE_BEHIND
+    if write_behind:
+        get_queue().submit(result)
+    else:
+        database.save_quiz_results([result])
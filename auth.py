@@ -0,0 +1,60 @@
+import os
+import hmac
+import hashlib
+import secrets
+import sqlite3
+import database
+
+# ✅ Password hashing settings (override through environment variables)
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "240000"))
+PASSWORD_SALT_BYTES = 16
+
+_ALGORITHM = "pbkdf2_sha256"
+
+def hash_password(password, iterations=PASSWORD_HASH_ITERATIONS):
+    """Returns a salted PBKDF2 hash as "pbkdf2_sha256$iterations$salt$hash"."""
+    salt = secrets.token_hex(PASSWORD_SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("ascii"), iterations)
+    return f"{_ALGORITHM}${iterations}${salt}${digest.hex()}"
+
+def verify_password(password, stored):
+    """Checks a password against a stored hash in constant time."""
+    try:
+        algorithm, iterations, salt, expected = stored.split("$")
+    except (AttributeError, ValueError):
+        return False
+    if algorithm != _ALGORITHM:
+        return False
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("ascii"), int(iterations))
+    return hmac.compare_digest(digest.hex(), expected)
+
+def create_user(username, password):
+    """Creates an account; returns False if the username is already taken.
+
+    The UNIQUE constraint decides, so two concurrent signups for one name cannot both win.
+    """
+    try:
+        with database.transaction() as conn:
+            conn.execute("INSERT INTO users (username, password) VALUES (?, ?)",
+                         (username, hash_password(password)))
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+def authenticate(username, password):
+    """Returns True if the username exists and the password matches (one indexed lookup)."""
+    with database.get_connection() as conn:
+        row = conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+    return row is not None and verify_password(password, row[0])
+
+def import_users(users):
+    """Bulk-imports {username: {"password": plaintext}} records, hashing each password.
+
+    Existing usernames are left untouched, so the import can be re-run safely; returns how many were added.
+    """
+    rows = [(username, hash_password(record.get("password", "")))
+            for username, record in users.items() if username]
+    with database.transaction() as conn:
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)", rows)
+        return conn.total_changes - before
@@ -0,0 +1,78 @@
+"""Recall/latency benchmark of the corpus HNSW index against exact NumPy search.
+
+Usage:
+    python benchmarks/ann_benchmark.py --chunks 1000000 --dim 384 --queries 200
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_index import CorpusIndex  # noqa: E402
+from retrieval import top_k  # noqa: E402
+
+def synthetic_vectors(n, dim, clusters, rng):
+    """Clustered, L2-normalized vectors that look more like real embeddings than uniform noise."""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--ef-search", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(args.chunks + args.queries, args.dim, args.clusters, rng)
+    corpus_vectors, queries = vectors[:args.chunks], vectors[args.chunks:]
+
+    corpus = CorpusIndex(args.dim)
+    if args.ef_search is not None:
+        corpus.index.hnsw.efSearch = args.ef_search
+    start = time.perf_counter()
+    # ✅ Insert in document-sized batches, the way ingestion does
+    for i in range(0, args.chunks, 10_000):
+        corpus.add(corpus_vectors[i:i + 10_000])
+    build_seconds = time.perf_counter() - start
+
+    exact_times, ann_times, recalls = [], [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        exact_ids, _ = top_k(corpus_vectors, query, args.k)
+        t1 = time.perf_counter()
+        ann_ids, _ = corpus.search(query, args.k)
+        t2 = time.perf_counter()
+        exact_times.append(t1 - t0)
+        ann_times.append(t2 - t1)
+        recalls.append(len(set(exact_ids.tolist()) & set(ann_ids[0].tolist())) / args.k)
+
+    print(json.dumps({
+        "chunks": args.chunks,
+        "dim": args.dim,
+        "k": args.k,
+        "ef_search": corpus.index.hnsw.efSearch,
+        "build_seconds": round(build_seconds, 3),
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+        "exact_p50_ms": round(percentile_ms(exact_times, 50), 3),
+        "exact_p99_ms": round(percentile_ms(exact_times, 99), 3),
+        "ann_p50_ms": round(percentile_ms(ann_times, 50), 3),
+        "ann_p99_ms": round(percentile_ms(ann_times, 99), 3),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
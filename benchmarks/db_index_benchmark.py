@@ -0,0 +1,156 @@
+"""Latency of the per-user quiz queries on a large synthetic database, before and after the index migration.
+
+Usage:
+    python benchmarks/db_index_benchmark.py --rows 10000000 --users 20000 --queries 200
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# ✅ Point the app's database at a scratch file before it is imported
+_workdir = tempfile.mkdtemp(prefix="db_index_benchmark_")
+os.environ.setdefault("DB_PATH", os.path.join(_workdir, "benchmark.db"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+BATCH_SIZE = 100_000
+
+# ✅ The migration under test and the indexes it creates
+USER_TIME_MIGRATION = 2
+USER_TIME_INDEXES = ("idx_quiz_scores_user_time", "idx_quiz_attempts_user_time")
+
+def synthetic_rows(n, users, rng):
+    """Yields (username, score, total, question, user_answer, correct_answer, timestamp) spread over a year."""
+    start = datetime(2024, 1, 1)
+    for _ in range(n):
+        total = rng.randint(5, 20)
+        correct = rng.choice("ABCD")
+        yield (
+            f"user{rng.randrange(users)}",
+            rng.randint(0, total),
+            total,
+            f"Question {rng.randrange(1_000_000)}",
+            rng.choice("ABCD"),
+            correct,
+            (start + timedelta(seconds=rng.randrange(365 * 24 * 3600))).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+def populate(conn, rows, users, seed):
+    rng = random.Random(seed)
+    batch = []
+
+    def flush():
+        conn.executemany("INSERT INTO quiz_scores (username, score, total_questions, timestamp) VALUES (?, ?, ?, ?)",
+                         [(r[0], r[1], r[2], r[6]) for r in batch])
+        conn.executemany("""
+            INSERT INTO quiz_attempts (username, question, user_answer, correct_answer, timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(r[0], r[3], r[4], r[5], r[6]) for r in batch])
+        conn.commit()
+        batch.clear()
+
+    for row in synthetic_rows(rows, users, rng):
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+QUERIES = {
+    "get_user_quiz_history": database.get_user_quiz_history,
+    "get_quiz_scores": database.get_quiz_scores,
+    "get_incorrect_answers": database.get_incorrect_answers,
+}
+
+def query_plans(conn):
+    plans = {}
+    for table in ("quiz_scores", "quiz_attempts"):
+        rows = conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE username = ? ORDER BY timestamp DESC",
+                            ("user0",)).fetchall()
+        plans[table] = [row[-1] for row in rows]
+    return plans
+
+def time_queries(usernames):
+    results = {}
+    for name, fn in QUERIES.items():
+        samples = []
+        for username in usernames:
+            t0 = time.perf_counter()
+            fn(username)
+            samples.append(time.perf_counter() - t0)
+        results[name] = {
+            "p50_ms": float(np.percentile(samples, 50) * 1000),
+            "p99_ms": float(np.percentile(samples, 99) * 1000),
+            "mean_ms": float(np.mean(samples) * 1000),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Rows in each of quiz_scores and quiz_attempts")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200, help="Lookups per query function and phase")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="Keep the database file afterwards")
+    args = parser.parse_args()
+
+    database.initialize_db()
+    with database.get_connection() as conn:
+        # ✅ Start without the per-user indexes, like a database created before migration 2
+        for name in USER_TIME_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.commit()
+
+        t0 = time.perf_counter()
+        populate(conn, args.rows, args.users, args.seed)
+        populate_seconds = time.perf_counter() - t0
+        plans_before = query_plans(conn)
+
+    rng = random.Random(args.seed + 1)
+    usernames = [f"user{rng.randrange(args.users)}" for _ in range(args.queries)]
+    before = time_queries(usernames)
+
+    with database.get_connection() as conn:
+        # ✅ Re-apply migration 2 exactly as shipped
+        t0 = time.perf_counter()
+        for statement in database.MIGRATIONS[USER_TIME_MIGRATION - 1]:
+            conn.execute(statement)
+        conn.commit()
+        migrate_seconds = time.perf_counter() - t0
+        version = database.get_schema_version(conn)
+        plans_after = query_plans(conn)
+    after = time_queries(usernames)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "users": args.users,
+        "queries": args.queries,
+        "schema_version": version,
+        "populate_seconds": populate_seconds,
+        "migrate_seconds": migrate_seconds,
+        "before": before,
+        "after": after,
+        "speedup_p50": {name: before[name]["p50_ms"] / max(after[name]["p50_ms"], 1e-9) for name in QUERIES},
+        "query_plan_before": plans_before,
+        "query_plan_after": plans_after,
+        "db_path": database.DB_PATH,
+    }, indent=2))
+
+    database.close_pool()
+    if not args.keep and database.DB_PATH.startswith(_workdir):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(database.DB_PATH + suffix):
+                os.remove(database.DB_PATH + suffix)
+        os.rmdir(_workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Reproducible benchmark suite: PDF extraction, LLM calls against a local fake server, and database queries.
+
+Everything runs offline in a scratch directory: synthetic PDFs, the fake Groq-compatible server from
+fake_llm_server.py (with configurable latency) and a synthetic SQLite dataset. Results are printed as
+JSON (throughput and p50/p95/p99 latency per operation), so runs can be saved and compared across commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --only db --db-users 5000 --db-quizzes 200000
+    python benchmarks/run_benchmarks.py --baseline main.json --tolerance 0.25   # exits 1 on a regression
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fake_llm_server  # noqa: E402
+
+SUITES = ("pdf", "llm", "db")
+
+# ✅ Latency compared against the baseline when looking for regressions
+REGRESSION_METRIC = "p50_ms"
+
+WORDS = ("learning model data neural network gradient function vector matrix probability "
+         "training inference layer feature dataset optimization loss accuracy tensor").split()
+
+def configure_environment(workdir, args):
+    """Points the app's database, caches and LLM client at scratch locations; must run before app imports."""
+    server = fake_llm_server.start_server(latency=args.llm_latency)
+    os.environ.update({
+        "DB_PATH": os.path.join(workdir, "benchmark.db"),
+        "PDF_CACHE_DIR": os.path.join(workdir, "pdf_cache"),
+        "GROQ_BASE_URL": f"http://127.0.0.1:{server.server_address[1]}",
+        "GROQ_API_KEY": "fake",
+        # ✅ Keep the embedding model out of the LLM timings; semantic lookups have their own benchmark
+        "RESPONSE_CACHE_SEMANTIC": "0",
+        "METRICS_JSONL_PATH": "",
+    })
+    return server
+
+def summarize(samples, wall_seconds):
+    """Returns ops, throughput and latency percentiles (ms) for a list of per-call durations in seconds."""
+    samples = np.asarray(samples)
+    return {
+        "ops": int(len(samples)),
+        "seconds": round(wall_seconds, 4),
+        "throughput_per_s": round(len(samples) / wall_seconds, 2) if wall_seconds else None,
+        "mean_ms": round(float(samples.mean() * 1000), 3),
+        "p50_ms": round(float(np.percentile(samples, 50) * 1000), 3),
+        "p95_ms": round(float(np.percentile(samples, 95) * 1000), 3),
+        "p99_ms": round(float(np.percentile(samples, 99) * 1000), 3),
+    }
+
+def measure(fn, inputs, concurrency=1):
+    """Calls fn(x) for every input (on `concurrency` threads) and summarizes the per-call latencies."""
+    def timed_call(x):
+        t0 = time.perf_counter()
+        fn(x)
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed_call, inputs))
+    else:
+        samples = [timed_call(x) for x in inputs]
+    return summarize(samples, time.perf_counter() - t0)
+
+def synthetic_pdf(pages, words_per_page, seed):
+    """Builds a text PDF in memory; the seed goes on the first page so every document hashes differently."""
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        words = " ".join(rng.choice(WORDS) for _ in range(words_per_page))
+        text = f"Document {seed}, page {number + 1}.\n{words}"
+        page.insert_textbox(fitz.Rect(36, 36, page.rect.width - 36, page.rect.height - 36), text, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def run_pdf(args):
+    from utils import extract_text_from_pdf
+
+    documents = [synthetic_pdf(args.pdf_pages, args.pdf_words, seed) for seed in range(args.pdf_docs)]
+    cold = measure(lambda data: extract_text_from_pdf(io.BytesIO(data)), documents)
+    # ✅ Same documents again: served from the on-disk page cache
+    cached = measure(lambda data: extract_text_from_pdf(io.BytesIO(data)), documents)
+    return {"pdf.extract_text.cold": cold, "pdf.extract_text.cached": cached}
+
+def run_llm(args):
+    import ai
+
+    rng = random.Random(args.seed)
+    context = " ".join(rng.choice(WORDS) for _ in range(args.llm_context_words))
+    questions = [f"Question {i}: explain {rng.choice(WORDS)} and {rng.choice(WORDS)}?" for i in range(args.llm_requests)]
+
+    # ✅ Warm up the HTTP connection pool and database outside the timings
+    ai.get_response("Warm-up question", context)
+    return {
+        # ✅ Distinct questions miss the response cache and reach the server
+        "llm.get_response": measure(lambda q: ai.get_response(q, context), questions,
+                                    concurrency=args.concurrency),
+        # ✅ The same questions again are answered from the response cache
+        "llm.get_response.cached": measure(lambda q: ai.get_response(q, context), questions,
+                                           concurrency=args.concurrency),
+        "llm.get_quiz_questions": measure(lambda _: ai.get_quiz_questions(context), range(args.llm_requests),
+                                          concurrency=args.concurrency),
+    }
+
+def populate_db(args):
+    """Writes db_quizzes synthetic quizzes (5-20 answers each) for db_users users through save_quiz_results."""
+    import database
+
+    rng = random.Random(args.seed)
+    courses = [f"course{i}" for i in range(args.db_courses)]
+    start = time.time() - 365 * 24 * 3600
+    batch = []
+    t0 = time.perf_counter()
+    for _ in range(args.db_quizzes):
+        total = rng.randint(5, 20)
+        attempts = [(f"Question {rng.randrange(100_000)}", rng.choice("ABCD"), rng.choice("ABCD"))
+                    for _ in range(total)]
+        score = sum(1 for _, given, correct in attempts if given == correct)
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + rng.randrange(365 * 24 * 3600)))
+        batch.append((f"user{rng.randrange(args.db_users)}", score, total, attempts, timestamp, rng.choice(courses)))
+        if len(batch) >= 1000:
+            database.save_quiz_results(batch)
+            batch.clear()
+    database.save_quiz_results(batch)
+    return time.perf_counter() - t0
+
+def run_db(args):
+    import database
+    import leaderboard
+
+    populate_seconds = populate_db(args)
+    rng = random.Random(args.seed + 1)
+    usernames = [f"user{rng.randrange(args.db_users)}" for _ in range(args.db_queries)]
+    c = args.concurrency
+
+    return {
+        "db.populate": {"quizzes": args.db_quizzes, "seconds": round(populate_seconds, 4),
+                        "throughput_per_s": round(args.db_quizzes / populate_seconds, 2)},
+        "db.get_quiz_scores": measure(database.get_quiz_scores, usernames, c),
+        "db.get_user_quiz_history": measure(database.get_user_quiz_history, usernames, c),
+        "db.get_incorrect_answers": measure(database.get_incorrect_answers, usernames, c),
+        "db.get_user_stats": measure(database.get_user_stats, usernames, c),
+        "db.get_class_average_score": measure(lambda _: database.get_class_average_score(), usernames, c),
+        "db.get_daily_stats": measure(lambda _: database.get_daily_stats(), usernames, c),
+        "db.leaderboard.page": measure(lambda _: leaderboard.get_leaderboard(), usernames, c),
+        "db.leaderboard.page_last_30_days": measure(lambda _: leaderboard.get_leaderboard(window="Last 30 days"),
+                                                    usernames, c),
+        "db.leaderboard.user_rank": measure(leaderboard.get_user_rank, usernames, c),
+        "db.save_quiz_score": measure(lambda u: database.save_quiz_score(u, 3, 5, "course0"), usernames, c),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, tolerance):
+    """Returns ops whose REGRESSION_METRIC grew by more than `tolerance` (a fraction) over the baseline."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name, {}).get(REGRESSION_METRIC)
+        after = result.get(REGRESSION_METRIC)
+        if before and after is not None and after > before * (1 + tolerance):
+            regressions.append({"op": name, "baseline_ms": before, "current_ms": after,
+                                "change": round(after / before - 1, 3)})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--concurrency", type=int, default=1, help="Threads issuing LLM and database calls")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pdf-docs", type=int, default=10, help="Synthetic PDFs to extract")
+    parser.add_argument("--pdf-pages", type=int, default=20)
+    parser.add_argument("--pdf-words", type=int, default=400, help="Words per page")
+    parser.add_argument("--llm-requests", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds the fake server waits per request")
+    parser.add_argument("--llm-context-words", type=int, default=300)
+    parser.add_argument("--db-users", type=int, default=2_000)
+    parser.add_argument("--db-quizzes", type=int, default=50_000)
+    parser.add_argument("--db-courses", type=int, default=5)
+    parser.add_argument("--db-queries", type=int, default=500, help="Calls per query function")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before an op counts as a regression")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory afterwards")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ai_tutor_benchmark_")
+    server = configure_environment(workdir, args)
+    results = {}
+    try:
+        # ✅ App modules print status lines; keep stdout for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            runners = {"pdf": run_pdf, "llm": run_llm, "db": run_db}
+            for suite in args.only:
+                print(f"[benchmark] Running {suite}...")
+                results.update(runners[suite](args))
+            import metrics
+            counters = metrics.snapshot()["counters"]
+    finally:
+        server.shutdown()
+        if "database" in sys.modules:
+            sys.modules["database"].close_pool()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": vars(args),
+        "results": results,
+        "counters": counters,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        report["baseline_commit"] = baseline.get("commit")
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Import-time report for the Streamlit entry point and each page module, built on `python -X importtime`.
+
+Every module is imported in a fresh interpreter, so the numbers are what a new worker pays.
+
+Usage:
+    python benchmarks/startup_report.py
+    python benchmarks/startup_report.py --modules login utils dashboard --top 15 --render
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ✅ What app.py imports up front, then what each page adds when it is opened
+DEFAULT_MODULES = ["streamlit", "login", "utils", "chat", "quiz", "dashboard"]
+
+RENDER_SNIPPET = (
+    "from streamlit.testing.v1 import AppTest\n"
+    "at = AppTest.from_file('app.py', default_timeout=120).run()\n"
+    "assert not at.exception, at.exception\n"
+)
+
+def parse_importtime(stderr):
+    """Returns (name, depth, self_us, cumulative_us) for every line of -X importtime output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, raw_name = line[len("import time:"):].split("|", 2)
+        name = raw_name.lstrip()
+        depth = (len(raw_name) - len(name) - 1) // 2
+        entries.append((name, depth, int(self_us), int(cumulative_us)))
+    return entries
+
+def measure_import(module, top):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+
+    entries = parse_importtime(result.stderr)
+    own = [e for e in entries if e[0] == module and e[1] == 0]
+    # Direct dependencies of the module, heaviest first
+    children = sorted((e for e in entries if e[1] == 1), key=lambda e: e[3], reverse=True)
+    return {
+        "import_ms": own[-1][3] / 1000 if own else None,
+        "process_wall_ms": wall * 1000,
+        "modules_loaded": len(entries),
+        "heaviest": [{"module": name, "cumulative_ms": cumulative / 1000} for name, _, _, cumulative in children[:top]],
+    }
+
+def measure_render():
+    """Wall time for a fresh interpreter to run app.py up to the login form (Streamlit's AppTest, no browser)."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", RENDER_SNIPPET], cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return {"login_render_seconds": wall}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="Heaviest direct imports to list per module")
+    parser.add_argument("--render", action="store_true", help="Also time a cold run of app.py to the login form")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "imports": {m: measure_import(m, args.top) for m in args.modules}}
+    if args.render:
+        report["render"] = measure_render()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,60 @@
 import streamlit as st
 import ai  # Import AI response handler
-from utils import extract_text_from_pdf  # Ensure utils functions are correctly imported
-
-# ✅ Ensure all session state variables are initialized
-if "chat_history" not in st.session_state:
-    st.session_state["chat_history"] = []
-
-if "pdf_text" not in st.session_state:
-    st.session_state["pdf_text"] = ""
+import chat_history
+import prompt_builder
+from utils import current_pdf_job, get_pdf_text, ingest_uploaded_pdf  # Ensure utils functions are correctly imported
 
 def get_ai_explanation(user_input):
     """Gets an AI-generated explanation using the uploaded PDF content."""
-    prompt = "You are an AI tutor. Answer clearly and concisely."
+    # ✅ ai.get_response retrieves only the chunks relevant to this question
+    summary, history = prompt_builder.conversation_memory(st.session_state)
+    response = ai.get_response(user_input, get_pdf_text(), history, summary, st.session_state.get("pdf_hash"))
+    return response
 
-    if st.session_state["pdf_text"]:
-        prompt += f"\nUse this document as reference:\n{st.session_state['pdf_text'][:2000]}"
+def stream_ai_explanation(user_input):
+    """Streams an AI-generated explanation using the uploaded PDF content."""
+    summary, history = prompt_builder.conversation_memory(st.session_state)
+    return ai.stream_response(user_input, get_pdf_text(), history, summary, st.session_state.get("pdf_hash"))
 
-    response = ai.get_response(user_input, prompt)
-    return response
+@st.fragment(run_every=2)
+def ingestion_progress():
+    """Shows extraction progress while pages arrive."""
+    job = current_pdf_job()
+    if job is None or job.done:
+        # ✅ A full rerun replaces this fragment with the final status, which stops the polling
+        st.rerun()
+    st.info(f"⏳ Extracted {len(job.pages)} / {job.total_pages} pages. You can start asking questions now.")
+
+def ingestion_status(job):
+    """Shows the outcome of extraction, polling only while it is still running."""
+    if job.error is not None:
+        st.error(f"❌ Failed to read PDF: {job.error}")
+    elif job.done:
+        st.success("✅ PDF uploaded successfully!")
+    else:
+        ingestion_progress()
 
 def chat_ui():
     """Chat interface for AI tutor."""
     st.title("💬 AI Tutor Chat")
 
+    # ✅ Ensure all session state variables are initialized (this module is imported once per process)
+    chat_history.init_state(st.session_state)
+
     # ✅ File uploader for PDF
     uploaded_file = st.file_uploader("📂 Upload a PDF", type=["pdf"], key="chat_pdf_1")
     if uploaded_file:
-        st.session_state["pdf_text"] = extract_text_from_pdf(uploaded_file)
-        st.success("✅ PDF uploaded successfully!")
+        ingestion_status(ingest_uploaded_pdf(uploaded_file))
 
-    # ✅ Display chat history only if messages exist
-    if st.session_state["chat_history"]:
+    # ✅ Display chat history only if messages exist, one page at a time (older pages load from the database)
+    if chat_history.turn_count(st.session_state):
         st.subheader("📝 Chat History:")
-        for chat in st.session_state["chat_history"]:
+        pages = chat_history.page_count(st.session_state)
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"History page (1 = latest, {pages} = oldest)", min_value=1, max_value=pages,
+                                   key="chat_history_page")
+        for chat in chat_history.get_page(st.session_state, page):
             with st.chat_message("user"):
                 st.write(f"**You:** {chat['question']}")
             with st.chat_message("assistant"):
@@ -45,14 +67,15 @@ def chat_ui():
 
     if st.button("Send"):
         if user_input.strip():
-            ai_response = get_ai_explanation(user_input)
-
-            # ✅ Store conversation history
-            st.session_state["chat_history"].append({"question": user_input, "answer": ai_response})
-
-            # ✅ Display AI response
+            # ✅ Display AI response token by token as it is generated
             with st.chat_message("assistant"):
-                st.write(ai_response)
+                ai_response = st.write_stream(stream_ai_explanation(user_input))
+
+            # ✅ Store conversation history (older turns are spilled to the database)
+            chat_history.append_turn(st.session_state, user_input, ai_response)
+            # ✅ Fold older turns into the summary in the background, after the answer has been shown
+            prompt_builder.update_summary(st.session_state)
+            st.session_state.pop("chat_history_page", None)
 
             # ✅ Refresh UI to display the message
             st.rerun()
@@ -0,0 +1,66 @@
+import os
+import uuid
+import database
+
+# ✅ Chat history limits (override through environment variables)
+# Turns kept in session state; older ones are spilled to SQLite and read back a page at a time
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "20"))
+CHAT_PAGE_SIZE = int(os.getenv("CHAT_PAGE_SIZE", "10"))
+CHAT_HISTORY_RETENTION_DAYS = int(os.getenv("CHAT_HISTORY_RETENTION_DAYS", "7"))
+
+def init_state(state):
+    """Ensures the session has a chat id, an in-memory window and a spilled-turn counter."""
+    if "chat_session_id" not in state:
+        state["chat_session_id"] = uuid.uuid4().hex
+    if "chat_history" not in state:
+        state["chat_history"] = []
+    if "chat_spilled" not in state:
+        state["chat_spilled"] = 0
+
+def recent_turns(state):
+    """Returns the turns still held in memory, oldest first."""
+    return state["chat_history"]
+
+def turn_count(state):
+    return state["chat_spilled"] + len(state["chat_history"])
+
+def _spill(state, turns):
+    with database.transaction() as conn:
+        conn.executemany("INSERT INTO chat_messages (session_id, username, question, answer) VALUES (?, ?, ?, ?)",
+                         [(state["chat_session_id"], state.get("username"), t["question"], t["answer"]) for t in turns])
+        conn.execute("DELETE FROM chat_messages WHERE created_at < datetime('now', ?)",
+                     (f"-{CHAT_HISTORY_RETENTION_DAYS} days",))
+    state["chat_spilled"] += len(turns)
+
+def append_turn(state, question, answer, window=CHAT_HISTORY_WINDOW):
+    """Adds a turn, moving the oldest ones to SQLite once the in-memory window is full."""
+    history = state["chat_history"]
+    history.append({"question": question, "answer": answer})
+    overflow = len(history) - window
+    if overflow > 0:
+        _spill(state, history[:overflow])
+        del history[:overflow]
+
+def load_turns(state, start, stop):
+    """Returns turns [start, stop) in chronological order, reading spilled ones from SQLite."""
+    spilled = state["chat_spilled"]
+    turns = []
+    if start < spilled:
+        with database.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT question, answer FROM chat_messages WHERE session_id = ?
+                ORDER BY id LIMIT ? OFFSET ?
+            """, (state["chat_session_id"], min(stop, spilled) - start, start)).fetchall()
+        turns = [{"question": q, "answer": a} for q, a in rows]
+    if stop > spilled:
+        turns += state["chat_history"][max(start - spilled, 0):stop - spilled]
+    return turns
+
+def page_count(state, page_size=CHAT_PAGE_SIZE):
+    return max(1, -(-turn_count(state) // page_size))
+
+def get_page(state, page, page_size=CHAT_PAGE_SIZE):
+    """Returns one page of turns; page 1 is the most recent, each page is oldest first."""
+    total = turn_count(state)
+    stop = max(total - (page - 1) * page_size, 0)
+    return load_turns(state, max(stop - page_size, 0), stop)
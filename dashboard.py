@@ -1,7 +1,31 @@
+import io
+import os
 import streamlit as st
 import database
+import leaderboard
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+# ✅ Rendered charts kept per process (override through environment variables)
+CHART_CACHE_ENTRIES = int(os.getenv("CHART_CACHE_ENTRIES", "1000"))
+
+@st.cache_data(max_entries=CHART_CACHE_ENTRIES, show_spinner=False)
+def render_performance_chart(dates, percentages):
+    """Renders the score trend to PNG bytes, cached by the score data itself.
+
+    Uses a standalone Figure (no pyplot global state), so it is thread-safe and freed after rendering.
+    """
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    ax.plot(dates, percentages, marker="o", linestyle="-", color="blue", label="Your Score")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Score (%)")
+    ax.set_title("Quiz Performance Over Time")
+    ax.tick_params(axis="x", labelrotation=30)
+    ax.legend()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
 
 def categorize_skill(avg_score):
     """Categorizes user skill level based on average score."""
@@ -127,35 +151,35 @@ def performance_dashboard():
 
     # **3️⃣ Performance Trend Line Chart**
     st.subheader("📈 Your Quiz Performance Trend")
-    plt.figure(figsize=(8, 4))
-    plt.plot(df["Date"], df["Percentage"], marker="o", linestyle="-", color="blue", label="Your Score")
-    plt.xlabel("Date")
-    plt.ylabel("Score (%)")
-    plt.title("Quiz Performance Over Time")
-    plt.xticks(rotation=30)
-    plt.legend()
-    st.pyplot(plt)
-
-    # **4️⃣ Compare with Class Average**
+    chart = render_performance_chart(tuple(df["Date"]), tuple(df["Percentage"]))
+    st.image(chart, use_container_width=True)
+
+    # **4️⃣ Compare with Class Average** (lifetime averages, read from the rollup tables)
     class_avg = database.get_class_average_score()
+    user_stats = database.get_user_stats(username)
+    overall_avg = user_stats["average_percentage"] if user_stats else avg_score
     st.subheader("🏆 Class Performance Comparison")
-    st.write(f"📊 **Your Avg Score:** {avg_score:.2f}%")
+    if user_stats:
+        st.write(f"📝 **Quizzes Taken:** {user_stats['quizzes']} ({user_stats['correct']}/{user_stats['questions']} correct)")
+    st.write(f"📊 **Your Avg Score:** {overall_avg:.2f}%")
     st.write(f"📌 **Class Avg Score:** {class_avg:.2f}%")
 
-    if avg_score > class_avg:
+    if overall_avg > class_avg:
         st.success("🚀 You're performing above the class average!")
     else:
         st.warning("📉 Keep practicing to beat the class average!")
 
+    leaderboard.leaderboard_ui()
+
     # **5️⃣ Show Incorrect Answers with Explanations**
     st.subheader("❌ Review Incorrect Answers")
     incorrect_questions = database.get_incorrect_answers(username)
     if incorrect_questions:
-        for q in incorrect_questions:
-            st.write(f"❌ **Question:** {q['question']}")
-            st.write(f"📝 **Your Answer:** {q['user_answer']}")
-            st.write(f"✅ **Correct Answer:** {q['correct_answer']}")
-            st.write(f"📌 **Explanation:** {q['explanation']}")
+        # Rows are (question, user_answer, correct_answer) tuples
+        for question, user_answer, correct_answer in incorrect_questions:
+            st.write(f"❌ **Question:** {question}")
+            st.write(f"📝 **Your Answer:** {user_answer or '(skipped)'}")
+            st.write(f"✅ **Correct Answer:** {correct_answer}")
             st.write("---")
     else:
         st.success("🎯 Great job! You answered all questions correctly.")
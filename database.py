@@ -1,14 +1,133 @@
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+import metrics
 
-DB_PATH = "ai_tutor.db"
+DB_PATH = os.getenv("DB_PATH", "ai_tutor.db")
 
-def initialize_db():
-    """Creates the database and the necessary tables if they do not exist."""
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cursor = conn.cursor()
+# ✅ Connection pool settings (override through environment variables)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_CACHED_STATEMENTS = int(os.getenv("DB_CACHED_STATEMENTS", "256"))
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections in WAL mode.
+
+    Connections are reused, so each one keeps its compiled-statement cache warm.
+    """
+
+    def __init__(self, path, size=DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            cached_statements=DB_CACHED_STATEMENTS,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    def release(self, conn):
+        # ✅ Never hand out a connection with a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Returns the process-wide connection pool for DB_PATH, migrating the schema on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ConnectionPool(DB_PATH)
+                _migrate_pool(pool)
+                _pool = pool
+    return _pool
+
+def close_pool():
+    """Closes all pooled connections (e.g. before pointing DB_PATH at another file)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+@contextmanager
+def get_connection():
+    """Borrows a pooled connection for reads (or for writes committed by the caller)."""
+    pool = get_pool()
+    with metrics.span("db.pool_wait"):
+        conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
 
-    # ✅ Create quiz_scores table
-    cursor.execute("""
+@contextmanager
+def transaction(immediate=False):
+    """Borrows a pooled connection and commits on success or rolls back on error.
+
+    immediate=True takes the write lock up front, for read-then-write sequences.
+    """
+    with get_connection() as conn:
+        if immediate:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+# ✅ Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Each entry is a list of SQL statements or a callable taking the connection.
+# Never edit a migration that has shipped; append a new one instead.
+MIGRATIONS = [
+    # 1: base schema (IF NOT EXISTS, so databases created before versioning are adopted as-is)
+    [
+        """
         CREATE TABLE IF NOT EXISTS quiz_scores (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT,
@@ -16,10 +135,8 @@ def initialize_db():
             total_questions INTEGER,
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
-    """)
-
-    # ✅ Create quiz_attempts table
-    cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS quiz_attempts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT,
@@ -28,87 +145,382 @@ def initialize_db():
             correct_answer TEXT,
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
-    """)
-
-    # ✅ Create users table
-    cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT UNIQUE,
             password TEXT
         )
-    """)
+        """,
+        # Embedding store (vectors live in .npy files on disk)
+        """
+        CREATE TABLE IF NOT EXISTS embedding_documents (
+            doc_hash TEXT PRIMARY KEY,
+            model TEXT,
+            dim INTEGER,
+            chunk_count INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_used_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS embedding_chunks (
+            doc_hash TEXT,
+            chunk_index INTEGER,
+            content TEXT,
+            PRIMARY KEY (doc_hash, chunk_index)
+        )
+        """,
+        # Maps ANN index ids back to document chunks
+        """
+        CREATE TABLE IF NOT EXISTS corpus_chunks (
+            id INTEGER PRIMARY KEY,
+            doc_hash TEXT,
+            chunk_index INTEGER
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_corpus_chunks_doc ON corpus_chunks (doc_hash)",
+        # LLM answers keyed by question, model and context
+        """
+        CREATE TABLE IF NOT EXISTS response_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT,
+            context_hash TEXT,
+            question TEXT,
+            response TEXT,
+            embedding BLOB,
+            created_at REAL,
+            last_used_at REAL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_response_cache_scope ON response_cache (model, context_hash)",
+        "CREATE INDEX IF NOT EXISTS idx_response_cache_last_used ON response_cache (last_used_at)",
+        # Pre-generated questions per document
+        """
+        CREATE TABLE IF NOT EXISTS quiz_pool (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doc_hash TEXT,
+            question_key TEXT,
+            question TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (doc_hash, question_key)
+        )
+        """,
+    ],
+    # 2: per-user lookups (history, recent scores, incorrect answers) without full-table scans
+    [
+        "CREATE INDEX IF NOT EXISTS idx_quiz_scores_user_time ON quiz_scores (username, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_quiz_attempts_user_time ON quiz_attempts (username, timestamp)",
+        "ANALYZE",
+    ],
+    # 3: dashboard rollups per user, for the whole class and per day, kept current by triggers
+    [
+        """
+        CREATE TABLE IF NOT EXISTS user_stats (
+            username TEXT PRIMARY KEY,
+            quizzes INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            questions INTEGER NOT NULL DEFAULT 0,
+            percentage_sum REAL NOT NULL DEFAULT 0,
+            last_quiz_at DATETIME
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS class_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            students INTEGER NOT NULL DEFAULT 0,
+            quizzes INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            questions INTEGER NOT NULL DEFAULT 0,
+            percentage_sum REAL NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day TEXT PRIMARY KEY,
+            quizzes INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            questions INTEGER NOT NULL DEFAULT 0,
+            percentage_sum REAL NOT NULL DEFAULT 0
+        )
+        """,
+        # Backfill from existing scores
+        """
+        INSERT INTO user_stats (username, quizzes, correct, questions, percentage_sum, last_quiz_at)
+        SELECT username, COUNT(*), SUM(score), SUM(total_questions),
+               SUM(CASE WHEN total_questions > 0 THEN 100.0 * score / total_questions ELSE 0 END), MAX(timestamp)
+        FROM quiz_scores GROUP BY username
+        """,
+        """
+        INSERT INTO class_stats (id, students, quizzes, correct, questions, percentage_sum)
+        SELECT 1, (SELECT COUNT(*) FROM user_stats), COUNT(*), COALESCE(SUM(score), 0), COALESCE(SUM(total_questions), 0),
+               COALESCE(SUM(CASE WHEN total_questions > 0 THEN 100.0 * score / total_questions ELSE 0 END), 0)
+        FROM quiz_scores
+        """,
+        """
+        INSERT INTO daily_stats (day, quizzes, correct, questions, percentage_sum)
+        SELECT date(timestamp), COUNT(*), SUM(score), SUM(total_questions),
+               SUM(CASE WHEN total_questions > 0 THEN 100.0 * score / total_questions ELSE 0 END)
+        FROM quiz_scores GROUP BY date(timestamp)
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_quiz_scores_rollup AFTER INSERT ON quiz_scores
+        BEGIN
+            UPDATE class_stats SET
+                students = students + NOT EXISTS (SELECT 1 FROM user_stats WHERE username = NEW.username),
+                quizzes = quizzes + 1,
+                correct = correct + NEW.score,
+                questions = questions + NEW.total_questions,
+                percentage_sum = percentage_sum
+                    + CASE WHEN NEW.total_questions > 0 THEN 100.0 * NEW.score / NEW.total_questions ELSE 0 END
+            WHERE id = 1;
+
+            INSERT INTO user_stats (username, quizzes, correct, questions, percentage_sum, last_quiz_at)
+            VALUES (NEW.username, 1, NEW.score, NEW.total_questions,
+                    CASE WHEN NEW.total_questions > 0 THEN 100.0 * NEW.score / NEW.total_questions ELSE 0 END,
+                    NEW.timestamp)
+            ON CONFLICT (username) DO UPDATE SET
+                quizzes = quizzes + 1,
+                correct = correct + excluded.correct,
+                questions = questions + excluded.questions,
+                percentage_sum = percentage_sum + excluded.percentage_sum,
+                last_quiz_at = MAX(COALESCE(last_quiz_at, ''), excluded.last_quiz_at);
+
+            INSERT INTO daily_stats (day, quizzes, correct, questions, percentage_sum)
+            VALUES (date(NEW.timestamp), 1, NEW.score, NEW.total_questions,
+                    CASE WHEN NEW.total_questions > 0 THEN 100.0 * NEW.score / NEW.total_questions ELSE 0 END)
+            ON CONFLICT (day) DO UPDATE SET
+                quizzes = quizzes + 1,
+                correct = correct + excluded.correct,
+                questions = questions + excluded.questions,
+                percentage_sum = percentage_sum + excluded.percentage_sum;
+        END
+        """,
+    ],
+    # 4: courses and the leaderboard (each user's best quiz per course, plus across all courses as '*')
+    [
+        "ALTER TABLE quiz_scores ADD COLUMN course TEXT NOT NULL DEFAULT 'general'",
+        "ALTER TABLE quiz_scores ADD COLUMN percentage REAL",
+        "UPDATE quiz_scores SET percentage = CASE WHEN total_questions > 0 THEN 100.0 * score / total_questions ELSE 0 END",
+        "CREATE INDEX IF NOT EXISTS idx_quiz_scores_course_time ON quiz_scores (course, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_quiz_scores_time ON quiz_scores (timestamp)",
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            course TEXT NOT NULL,
+            username TEXT NOT NULL,
+            best_percentage REAL NOT NULL,
+            score INTEGER,
+            total_questions INTEGER,
+            achieved_at DATETIME,
+            PRIMARY KEY (course, username)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_leaderboard_rank ON leaderboard (course, best_percentage DESC, achieved_at, username)",
+        """
+        INSERT INTO leaderboard (course, username, best_percentage, score, total_questions, achieved_at)
+        SELECT course, username, percentage, score, total_questions, timestamp FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY course, username ORDER BY percentage DESC, timestamp) AS position
+            FROM quiz_scores
+        ) WHERE position = 1
+        """,
+        """
+        INSERT INTO leaderboard (course, username, best_percentage, score, total_questions, achieved_at)
+        SELECT '*', username, percentage, score, total_questions, timestamp FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY username ORDER BY percentage DESC, timestamp) AS position
+            FROM quiz_scores
+        ) WHERE position = 1
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_quiz_scores_leaderboard AFTER INSERT ON quiz_scores
+        BEGIN
+            INSERT INTO leaderboard (course, username, best_percentage, score, total_questions, achieved_at)
+            VALUES (NEW.course, NEW.username,
+                    CASE WHEN NEW.total_questions > 0 THEN 100.0 * NEW.score / NEW.total_questions ELSE 0 END,
+                    NEW.score, NEW.total_questions, NEW.timestamp)
+            ON CONFLICT (course, username) DO UPDATE SET
+                best_percentage = excluded.best_percentage,
+                score = excluded.score,
+                total_questions = excluded.total_questions,
+                achieved_at = excluded.achieved_at
+            WHERE excluded.best_percentage > leaderboard.best_percentage;
+
+            INSERT INTO leaderboard (course, username, best_percentage, score, total_questions, achieved_at)
+            VALUES ('*', NEW.username,
+                    CASE WHEN NEW.total_questions > 0 THEN 100.0 * NEW.score / NEW.total_questions ELSE 0 END,
+                    NEW.score, NEW.total_questions, NEW.timestamp)
+            ON CONFLICT (course, username) DO UPDATE SET
+                best_percentage = excluded.best_percentage,
+                score = excluded.score,
+                total_questions = excluded.total_questions,
+                achieved_at = excluded.achieved_at
+            WHERE excluded.best_percentage > leaderboard.best_percentage;
+        END
+        """,
+    ],
+    # 5: chat turns that no longer fit in a session's in-memory window
+    [
+        """
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            username TEXT,
+            question TEXT,
+            answer TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages (session_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_messages_created ON chat_messages (created_at)",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
 
-    conn.commit()
-    conn.close()
-    print("✅ Database initialized successfully!")
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
 
-# ✅ Function to connect to the database
-def connect_db():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    cursor = conn.cursor()
-    return conn, cursor
+def migrate(conn, target=SCHEMA_VERSION):
+    """Applies pending migrations up to `target`, one transaction per version.
+
+    Safe to run from several processes at once: the version is re-checked under the write lock.
+    """
+    for version in range(get_schema_version(conn) + 1, target + 1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            step = MIGRATIONS[version - 1]
+            if callable(step):
+                step(conn)
+            else:
+                for statement in step:
+                    conn.execute(statement)
+            # PRAGMA user_version is transactional, so a failed step leaves the version untouched
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return get_schema_version(conn)
+
+def _migrate_pool(pool):
+    conn = pool.acquire()
+    try:
+        with metrics.span("db.migrate"):
+            version = migrate(conn)
+    finally:
+        pool.release(conn)
+    print(f"✅ Database initialized successfully! (schema v{version})")
+
+def initialize_db():
+    """Creates the database and brings its schema up to date.
+
+    Runs once per process, the first time any query borrows a connection; importing this
+    module no longer touches the database.
+    """
+    get_pool()
+
+# ✅ Courses group scores on the leaderboard; quizzes without one land in the default course
+DEFAULT_COURSE = "general"
+
+def normalize_course(course):
+    return (course or "").strip().lower() or DEFAULT_COURSE
+
+def quiz_percentage(score, total_questions):
+    return 100.0 * score / total_questions if total_questions else 0.0
 
 # ✅ Save quiz score
-def save_quiz_score(username, score, total_questions):
-    conn, cursor = connect_db()
-    cursor.execute("INSERT INTO quiz_scores (username, score, total_questions) VALUES (?, ?, ?)",
-                   (username, score, total_questions))
-    conn.commit()
-    conn.close()
+@metrics.timed("db.save_quiz_score")
+def save_quiz_score(username, score, total_questions, course=DEFAULT_COURSE):
+    with transaction() as conn:
+        conn.execute("INSERT INTO quiz_scores (username, score, total_questions, course, percentage) VALUES (?, ?, ?, ?, ?)",
+                     (username, score, total_questions, normalize_course(course), quiz_percentage(score, total_questions)))
 
 # ✅ Get past quiz scores
+@metrics.timed("db.get_quiz_scores")
 def get_quiz_scores(username, limit=5):
-    conn, cursor = connect_db()
-    cursor.execute("SELECT score, total_questions, timestamp FROM quiz_scores WHERE username = ? ORDER BY timestamp DESC LIMIT ?",
-                   (username, limit))
-    past_scores = cursor.fetchall()
-    conn.close()
-    return past_scores
-
-# ✅ Get class average score
+    with get_connection() as conn:
+        return conn.execute("SELECT score, total_questions, timestamp FROM quiz_scores WHERE username = ? ORDER BY timestamp DESC LIMIT ?",
+                            (username, limit)).fetchall()
+
+# ✅ Get class average score (average quiz percentage, read from the class_stats rollup)
+@metrics.timed("db.get_class_average_score")
 def get_class_average_score():
-    conn, cursor = connect_db()
-    cursor.execute("SELECT AVG(score) FROM quiz_scores")
-    avg_score = cursor.fetchone()[0]
-    conn.close()
-    return avg_score if avg_score is not None else 0  
+    with get_connection() as conn:
+        row = conn.execute("SELECT percentage_sum / quizzes FROM class_stats WHERE id = 1 AND quizzes > 0").fetchone()
+    return row[0] if row is not None else 0  
+
+# ✅ Get a user's lifetime totals from the user_stats rollup
+@metrics.timed("db.get_user_stats")
+def get_user_stats(username):
+    """Returns {"quizzes", "correct", "questions", "average_percentage", "last_quiz_at"}, or None."""
+    with get_connection() as conn:
+        row = conn.execute("""
+            SELECT quizzes, correct, questions, percentage_sum / quizzes, last_quiz_at
+            FROM user_stats WHERE username = ? AND quizzes > 0
+        """, (username,)).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("quizzes", "correct", "questions", "average_percentage", "last_quiz_at"), row))
+
+# ✅ Get class-wide daily activity from the daily_stats rollup
+@metrics.timed("db.get_daily_stats")
+def get_daily_stats(days=30):
+    """Returns (day, quizzes, correct, questions, average_percentage) rows for the most recent days."""
+    with get_connection() as conn:
+        return conn.execute("""
+            SELECT day, quizzes, correct, questions, percentage_sum / quizzes
+            FROM daily_stats WHERE quizzes > 0 ORDER BY day DESC LIMIT ?
+        """, (days,)).fetchall()
 
 # ✅ Get user quiz history
+@metrics.timed("db.get_user_quiz_history")
 def get_user_quiz_history(username):
-    conn, cursor = connect_db()
-    cursor.execute("SELECT score, total_questions, timestamp FROM quiz_scores WHERE username = ? ORDER BY timestamp DESC LIMIT 5",
-                   (username,))
-    past_scores = cursor.fetchall()
-    conn.close()
-    return past_scores
+    with get_connection() as conn:
+        return conn.execute("SELECT score, total_questions, timestamp FROM quiz_scores WHERE username = ? ORDER BY timestamp DESC LIMIT 5",
+                            (username,)).fetchall()
 
 # ✅ Get incorrect answers
+@metrics.timed("db.get_incorrect_answers")
 def get_incorrect_answers(username):
     """Fetch incorrect quiz answers from the database."""
-    conn, cursor = connect_db()
-    
-    cursor.execute("""
-        SELECT question, user_answer, correct_answer 
-        FROM quiz_attempts 
-        WHERE username = ? AND user_answer != correct_answer
-    """, (username,))
-    
-    incorrect_answers = cursor.fetchall()
-    conn.close()
-    
-    return incorrect_answers
+    with get_connection() as conn:
+        return conn.execute("""
+            SELECT question, user_answer, correct_answer 
+            FROM quiz_attempts 
+            WHERE username = ? AND user_answer != correct_answer
+        """, (username,)).fetchall()
 
 # ✅ Save incorrect answers after a quiz
+@metrics.timed("db.save_incorrect_answers")
 def save_incorrect_answers(username, question, user_answer, correct_answer):
     """Saves incorrect quiz answers to the database."""
-    conn, cursor = connect_db()
-    cursor.execute("""
-        INSERT INTO quiz_attempts (username, question, user_answer, correct_answer) 
-        VALUES (?, ?, ?, ?)
-    """, (username, question, user_answer, correct_answer))
-    conn.commit()
-    conn.close()
-
-# ✅ Ensure DB is initialized on first run
-initialize_db()
\ No newline at end of file
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO quiz_attempts (username, question, user_answer, correct_answer) 
+            VALUES (?, ?, ?, ?)
+        """, (username, question, user_answer, correct_answer))
+
+# ✅ Save whole submitted quizzes (score plus every answer) in one transaction
+@metrics.timed("db.save_quiz_results")
+def save_quiz_results(results):
+    """Writes (username, score, total_questions, attempts, timestamp, course) tuples with one executemany per table.
+
+    attempts are (question, user_answer, correct_answer) rows; a None timestamp means now.
+    """
+    if not results:
+        return
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT INTO quiz_scores (username, score, total_questions, timestamp, course, percentage)
+            VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?)
+        """, [(username, score, total, ts, normalize_course(course), quiz_percentage(score, total))
+              for username, score, total, _, ts, course in results])
+        conn.executemany("""
+            INSERT INTO quiz_attempts (username, question, user_answer, correct_answer, timestamp)
+            VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        """, [(username, question, user_answer, correct_answer, ts)
+              for username, _, _, attempts, ts, _ in results
+              for question, user_answer, correct_answer in attempts])
\ No newline at end of file
@@ -1,10 +1,14 @@
 import os
 import json
-import sqlite3
 import streamlit as st
-import fitz  
-import groq
+import auth
+import database  # ✅ Shared pooled data-access layer (migrates the schema on first use)
+import leaderboard
+import pdf_cache
+import pdf_extract
 import re
+import llm_client
+from llm_client import LLM_MODEL
 from dotenv import load_dotenv
 from langchain_huggingface import HuggingFaceEmbeddings  # ✅ Updated Import
 
@@ -16,24 +20,9 @@ if not GROQ_API_KEY:
     raise ValueError("Missing GROQ_API_KEY! Please set it in .env.")
 
 # ✅ Initialize AI
-client = groq.Client(api_key=GROQ_API_KEY)
+client = llm_client.get_client()
 embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
 
-# ✅ Set up SQLite database
-conn = sqlite3.connect("ai_tutor.db", check_same_thread=False)
-cursor = conn.cursor()
-
-cursor.execute("""
-    CREATE TABLE IF NOT EXISTS quiz_scores (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT,
-        score INTEGER,
-        total_questions INTEGER,
-        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-""")
-conn.commit()
-
 # ✅ Ensure all session state keys are initialized
 for key, default in {
     "chat_history": [],
@@ -48,32 +37,17 @@ for key, default in {
     if key not in st.session_state:
         st.session_state[key] = default
 
-# ✅ User Authentication System
-USER_FILE = "users.json"
-
-def load_users():
-    """Load users from a JSON file."""
-    if os.path.exists(USER_FILE):
-        with open(USER_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_users(users):
-    """Save users to a JSON file."""
-    with open(USER_FILE, "w") as f:
-        json.dump(users, f)
-
+# ✅ User Authentication System (accounts live in the users table)
 def login():
     """Login system for the AI tutor."""
     st.sidebar.title("🔐 User Login")
-    users = load_users()
 
     username = st.sidebar.text_input("Username")
     password = st.sidebar.text_input("Password", type="password")
     login_button = st.sidebar.button("Login")
 
     if login_button:
-        if username in users and users[username]["password"] == password:
+        if auth.authenticate(username, password):
             st.session_state["authenticated"] = True
             st.session_state["username"] = username
             st.sidebar.success(f"✅ Welcome, {username}!")
@@ -89,12 +63,11 @@ def signup():
     signup_button = st.sidebar.button("Signup")
 
     if signup_button:
-        users = load_users()
-        if new_username in users:
+        if not new_username or not new_password:
+            st.sidebar.error("❌ Username and password are required!")
+        elif not auth.create_user(new_username, new_password):
             st.sidebar.error("❌ Username already exists!")
         else:
-            users[new_username] = {"password": new_password}
-            save_users(users)
             st.sidebar.success("✅ Account created! Please log in.")
 
 # ✅ Ensure user authentication before accessing the tutor
@@ -108,12 +81,14 @@ st.title("📚 AI Tutor with PDF & Quiz Support")
 
 # ✅ PDF Processing
 def extract_text_from_pdf(uploaded_file):
-    """Extracts text from PDF."""
-    text = ""
-    with fitz.open(stream=uploaded_file.read(), filetype="pdf") as doc:
-        for page in doc:
-            text += page.get_text("text") + "\n"
-    return text
+    """Extracts text from PDF, reusing the shared on-disk page cache."""
+    data = uploaded_file.getvalue()
+    doc_hash = pdf_cache.document_hash(data)
+    pages = pdf_cache.load_pages(doc_hash)
+    if pages is None:
+        pages = pdf_extract.extract_pages(data)
+        pdf_cache.save_pages(doc_hash, pages)
+    return "".join(page + "\n" for page in pages)
 
 uploaded_pdf = st.file_uploader("📂 Upload a PDF for AI Explanation", type=["pdf"])
 
@@ -129,7 +104,7 @@ def get_ai_explanation(user_input, pdf_text=""):
         prompt += f"\nUse the following document as reference:\n{pdf_text[:2000]}"
 
     response = client.chat.completions.create(
-        model="llama3-8b-8192",
+        model=LLM_MODEL,
         messages=[{"role": "system", "content": prompt}, {"role": "user", "content": user_input}]
     )
     return response.choices[0].message.content.strip()
@@ -171,7 +146,7 @@ def generate_quiz(pdf_text):
     )
 
     response = client.chat.completions.create(
-        model="llama3-8b-8192",
+        model=LLM_MODEL,
         messages=[{"role": "system", "content": prompt}]
     )
 
@@ -212,26 +187,14 @@ if st.session_state["quiz_started"]:
             if st.session_state.get(f"q{idx+1}") == q["answer"]
         )
         st.success(f"✅ Your Score: {st.session_state['score']} / {len(st.session_state['quiz_questions'])}")
-        conn = sqlite3.connect("ai_tutor.db", check_same_thread=False)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO quiz_scores (username, score, total_questions) VALUES (?, ?, ?)",
-                       (st.session_state["username"], st.session_state["score"], len(st.session_state["quiz_questions"])))
-        conn.commit()
-        conn.close()
+        database.save_quiz_score(st.session_state["username"], st.session_state["score"], len(st.session_state["quiz_questions"]))
         st.rerun()
 
 if st.session_state["quiz_finished"]:
     st.header("📝 Quiz Finished!")
     st.write(f"✅ Your Score: {st.session_state['score']} / {len(st.session_state['quiz_questions'])}")
     st.write("---")
-    st.write("📊 Leaderboard:")
-    conn = sqlite3.connect("ai_tutor.db", check_same_thread=False)
-    cursor = conn.cursor()
-    cursor.execute("SELECT username, score, total_questions, timestamp FROM quiz_scores ORDER BY score DESC")
-    scores = cursor.fetchall()
-    conn.close()
-    for idx, (username, score, total_questions, timestamp) in enumerate(scores):
-        st.write(f"🥇 {username} scored {score} / {total_questions} on {timestamp}")
+    leaderboard.leaderboard_ui()
     st.write("---") 
 
 if st.button("🔄 Restart Quiz"):
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import numpy as np
+import database
+
+# ✅ Vectors are shared between workers through memory-mapped .npy files
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", os.path.join(".cache", "embeddings"))
+EMBEDDING_STORE_MAX_DOCS = int(os.getenv("EMBEDDING_STORE_MAX_DOCS", "500"))
+
+def _vector_path(doc_hash):
+    return os.path.join(EMBEDDING_STORE_DIR, f"{doc_hash}.npy")
+
+class StoredChunks:
+    """Read-only sequence of chunk texts, fetched from SQLite on demand."""
+
+    def __init__(self, doc_hash, count):
+        self.doc_hash = doc_hash
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        content = get_chunk(self.doc_hash, index)
+        if content is None:
+            raise IndexError(index)
+        return content
+
+def get_chunk(doc_hash, index):
+    """Returns the text of one stored chunk, or None if it was pruned."""
+    with database.get_connection() as conn:
+        row = conn.execute("SELECT content FROM embedding_chunks WHERE doc_hash = ? AND chunk_index = ?",
+                           (doc_hash, int(index))).fetchone()
+    return row[0] if row else None
+
+def load(doc_hash, model_name):
+    """Returns (chunks, vectors) for a stored document, or None if it is missing or stale."""
+    with database.transaction() as conn:
+        row = conn.execute("SELECT model, dim, chunk_count FROM embedding_documents WHERE doc_hash = ?",
+                           (doc_hash,)).fetchone()
+        if row is None or row[0] != model_name:
+            return None
+        conn.execute("UPDATE embedding_documents SET last_used_at = CURRENT_TIMESTAMP WHERE doc_hash = ?", (doc_hash,))
+
+    _, dim, chunk_count = row
+    try:
+        vectors = np.load(_vector_path(doc_hash), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if vectors.shape != (chunk_count, dim):
+        return None
+    return StoredChunks(doc_hash, chunk_count), vectors
+
+def load_vectors(doc_hash):
+    """Returns the memory-mapped vectors of a stored document, or None if they were pruned."""
+    try:
+        return np.load(_vector_path(doc_hash), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+def save(doc_hash, model_name, chunks, vectors):
+    """Persists chunk texts and their float32 vectors for a document."""
+    os.makedirs(EMBEDDING_STORE_DIR, exist_ok=True)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    # ✅ Write vectors to a temp file first so no worker maps a half-written file
+    fd, tmp_path = tempfile.mkstemp(dir=EMBEDDING_STORE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, vectors)
+    os.replace(tmp_path, _vector_path(doc_hash))
+
+    dim = vectors.shape[1] if vectors.ndim == 2 else 0
+    with database.transaction() as conn:
+        conn.execute("DELETE FROM embedding_chunks WHERE doc_hash = ?", (doc_hash,))
+        conn.executemany("INSERT INTO embedding_chunks (doc_hash, chunk_index, content) VALUES (?, ?, ?)",
+                         [(doc_hash, i, chunk) for i, chunk in enumerate(chunks)])
+        conn.execute("""
+            INSERT OR REPLACE INTO embedding_documents (doc_hash, model, dim, chunk_count)
+            VALUES (?, ?, ?, ?)
+        """, (doc_hash, model_name, dim, len(chunks)))
+
+    prune()
+
+def prune(max_docs=None):
+    """Deletes the least recently used documents beyond max_docs."""
+    max_docs = EMBEDDING_STORE_MAX_DOCS if max_docs is None else max_docs
+
+    with database.transaction() as conn:
+        stale = [row[0] for row in conn.execute(
+            "SELECT doc_hash FROM embedding_documents ORDER BY last_used_at DESC LIMIT -1 OFFSET ?",
+            (max_docs,))]
+        for doc_hash in stale:
+            conn.execute("DELETE FROM embedding_chunks WHERE doc_hash = ?", (doc_hash,))
+            conn.execute("DELETE FROM embedding_documents WHERE doc_hash = ?", (doc_hash,))
+
+    for doc_hash in stale:
+        try:
+            os.remove(_vector_path(doc_hash))
+        except OSError:
+            pass
@@ -0,0 +1,122 @@
+"""Local Groq/OpenAI-compatible chat completions server for testing without an API key.
+
+Usage:
+    python fake_llm_server.py --port 8001 --latency 0.2
+    GROQ_BASE_URL=http://127.0.0.1:8001 GROQ_API_KEY=fake streamlit run app.py
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUIZ_QUESTION = {
+    "question": "What is AI?",
+    "options": ["A) Artificial Intelligence", "B) Machine Learning", "C) Deep Learning", "D) Neural Networks"],
+    "answer": "A) Artificial Intelligence",
+}
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Answers POST .../chat/completions with a canned reply after a configurable delay."""
+
+    latency = 0.0
+    stream_chunk_delay = 0.0
+    lock = threading.Lock()
+    request_count = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with FakeLLMHandler.lock:
+            FakeLLMHandler.request_count += 1
+            request_number = FakeLLMHandler.request_count
+
+        time.sleep(self.latency)
+        content = self.reply_for(body.get("messages", []), request_number)
+        model = body.get("model", "fake-model")
+
+        if body.get("stream"):
+            self.send_stream(content, model)
+        else:
+            self.send_json({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+    def reply_for(self, messages, request_number):
+        prompt = " ".join(str(m.get("content", "")) for m in messages)
+        # ✅ Quiz prompts get a well-formed JSON array of distinct questions, as many as requested
+        if "multiple-choice questions" in prompt:
+            count = 5
+            for word in prompt.split("multiple-choice questions")[0].split()[::-1]:
+                if word.isdigit():
+                    count = int(word)
+                    break
+            questions = [dict(QUIZ_QUESTION, question=f"What is AI? ({request_number}.{i + 1})") for i in range(count)]
+            return json.dumps(questions)
+        return "This is a fake answer from the local test server."
+
+    def send_json(self, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, content, model):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for word in content.split(" "):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.stream_chunk_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+def make_server(port=0, latency=0.0, stream_chunk_delay=0.0):
+    """Builds the server; port 0 picks a free port."""
+    handler = type("ConfiguredFakeLLMHandler", (FakeLLMHandler,), {
+        "latency": latency,
+        "stream_chunk_delay": stream_chunk_delay,
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+def start_server(port=0, latency=0.0, stream_chunk_delay=0.0):
+    """Starts the server on a background thread and returns it."""
+    server = make_server(port, latency, stream_chunk_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq-compatible LLM server")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.latency, args.stream_chunk_delay)
+    print(f"Fake LLM server listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
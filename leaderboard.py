@@ -0,0 +1,134 @@
+import os
+from datetime import datetime, timedelta, timezone
+import streamlit as st
+import database
+
+# ✅ Leaderboard settings (override through environment variables)
+LEADERBOARD_PAGE_SIZE = int(os.getenv("LEADERBOARD_PAGE_SIZE", "20"))
+
+# ✅ Key used in the leaderboard table for each user's best across every course
+ALL_COURSES = "*"
+
+# ✅ Time windows offered on the board; None means all time
+WINDOWS = {
+    "All time": None,
+    "Last 30 days": timedelta(days=30),
+    "Last 7 days": timedelta(days=7),
+    "Today": timedelta(days=1),
+}
+
+def _course_key(course):
+    return ALL_COURSES if course in (None, ALL_COURSES) else database.normalize_course(course)
+
+def _window_start(window):
+    """Returns the cutoff timestamp for a window (same format as CURRENT_TIMESTAMP), or None for all time."""
+    span = WINDOWS.get(window)
+    if span is None:
+        return None
+    return (datetime.now(timezone.utc) - span).strftime("%Y-%m-%d %H:%M:%S")
+
+def _window_filter(course, since):
+    sql, params = "timestamp >= ?", [since]
+    if course != ALL_COURSES:
+        sql += " AND course = ?"
+        params.append(course)
+    return sql, params
+
+def get_courses():
+    """Returns every course that has at least one score."""
+    with database.get_connection() as conn:
+        rows = conn.execute("SELECT DISTINCT course FROM leaderboard WHERE course != ? ORDER BY course",
+                            (ALL_COURSES,)).fetchall()
+    return [row[0] for row in rows]
+
+def get_leaderboard(course=None, window="All time", limit=LEADERBOARD_PAGE_SIZE, offset=0):
+    """Returns one page of (username, best_percentage, score, total_questions, achieved_at) rows, best first.
+
+    All-time boards read the pre-ranked leaderboard table through its index; windowed boards
+    only touch scores inside the window.
+    """
+    course, since = _course_key(course), _window_start(window)
+    with database.get_connection() as conn:
+        if since is None:
+            return conn.execute("""
+                SELECT username, best_percentage, score, total_questions, achieved_at
+                FROM leaderboard WHERE course = ?
+                ORDER BY best_percentage DESC, achieved_at, username LIMIT ? OFFSET ?
+            """, (course, limit, offset)).fetchall()
+        where, params = _window_filter(course, since)
+        # SQLite takes the bare columns from the row holding MAX(percentage)
+        return conn.execute(f"""
+            SELECT username, MAX(percentage) AS best, score, total_questions, timestamp
+            FROM quiz_scores WHERE {where}
+            GROUP BY username ORDER BY best DESC, timestamp, username LIMIT ? OFFSET ?
+        """, (*params, limit, offset)).fetchall()
+
+def get_leaderboard_size(course=None, window="All time"):
+    """Returns how many users are on the board."""
+    course, since = _course_key(course), _window_start(window)
+    with database.get_connection() as conn:
+        if since is None:
+            return conn.execute("SELECT COUNT(*) FROM leaderboard WHERE course = ?", (course,)).fetchone()[0]
+        where, params = _window_filter(course, since)
+        return conn.execute(f"SELECT COUNT(DISTINCT username) FROM quiz_scores WHERE {where}", params).fetchone()[0]
+
+def get_user_rank(username, course=None, window="All time"):
+    """Returns (rank, best_percentage) for a user, or None if they are not on the board.
+
+    Rank is 1 + the number of users with a strictly better best score, counted from the index
+    entries above the user instead of ranking the whole table.
+    """
+    course, since = _course_key(course), _window_start(window)
+    with database.get_connection() as conn:
+        if since is None:
+            row = conn.execute("SELECT best_percentage FROM leaderboard WHERE course = ? AND username = ?",
+                               (course, username)).fetchone()
+            if row is None:
+                return None
+            above = conn.execute("SELECT COUNT(*) FROM leaderboard WHERE course = ? AND best_percentage > ?",
+                                 (course, row[0])).fetchone()[0]
+            return above + 1, row[0]
+
+        where, params = _window_filter(course, since)
+        best = conn.execute(f"SELECT MAX(percentage) FROM quiz_scores WHERE username = ? AND {where}",
+                            (username, *params)).fetchone()[0]
+        if best is None:
+            return None
+        above = conn.execute(f"SELECT COUNT(DISTINCT username) FROM quiz_scores WHERE {where} AND percentage > ?",
+                             (*params, best)).fetchone()[0]
+        return above + 1, best
+
+def leaderboard_ui():
+    """Shows a paginated leaderboard with course and time-window filters."""
+    st.subheader("🏅 Leaderboard")
+
+    col1, col2 = st.columns(2)
+    courses = ["All courses"] + get_courses()
+    course_label = col1.selectbox("Course", courses, key="leaderboard_course")
+    window = col2.selectbox("Period", list(WINDOWS), key="leaderboard_window")
+    course = None if course_label == "All courses" else course_label
+
+    total = get_leaderboard_size(course, window)
+    if not total:
+        st.info("📭 No scores on this board yet.")
+        return
+
+    pages = (total + LEADERBOARD_PAGE_SIZE - 1) // LEADERBOARD_PAGE_SIZE
+    # ✅ Switching to a smaller board must not leave the page number out of range
+    if st.session_state.get("leaderboard_page", 1) > pages:
+        st.session_state["leaderboard_page"] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="leaderboard_page")
+    offset = (page - 1) * LEADERBOARD_PAGE_SIZE
+
+    rows = get_leaderboard(course, window, LEADERBOARD_PAGE_SIZE, offset)
+    st.table([
+        {"Rank": offset + i + 1, "Student": username, "Score": f"{score} / {total_questions}",
+         "Percentage": f"{best:.1f}%", "Date": achieved_at}
+        for i, (username, best, score, total_questions, achieved_at) in enumerate(rows)
+    ])
+
+    username = st.session_state.get("username")
+    if username:
+        rank = get_user_rank(username, course, window)
+        if rank:
+            st.write(f"📍 **Your Rank:** #{rank[0]} of {total} ({rank[1]:.1f}%)")
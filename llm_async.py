@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import queue
+import asyncio
+import hashlib
+import threading
+import llm_client
+import metrics
+from llm_client import LLM_MODEL
+
+# ✅ Concurrency limits (override through environment variables)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MODEL_CONCURRENCY = int(os.getenv("LLM_MODEL_CONCURRENCY", "8"))
+
+# All coroutines below run on one background event loop per process, shared by every
+# Streamlit session thread, so the limits and request coalescing apply process-wide.
+
+_loop = None
+_loop_lock = threading.Lock()
+_global_semaphore = None
+_model_semaphores = {}
+_inflight = {}
+_streams = {}
+_STREAM_END = object()
+
+def get_loop():
+    """Returns the background event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-async", daemon=True).start()
+            _loop = loop
+    return _loop
+
+def _model_semaphore(model):
+    global _global_semaphore
+    if _global_semaphore is None:
+        _global_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    if model not in _model_semaphores:
+        _model_semaphores[model] = asyncio.Semaphore(LLM_MODEL_CONCURRENCY)
+    return _model_semaphores[model]
+
+def request_key(model, messages, params):
+    raw = json.dumps([model, messages, params], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+async def _call(model, messages, params):
+    model_semaphore = _model_semaphore(model)
+    queued_at = time.perf_counter()
+    async with _global_semaphore, model_semaphore:
+        # ✅ Time spent waiting for a concurrency slot, separate from the upstream call itself
+        metrics.observe("span_duration_seconds", time.perf_counter() - queued_at, span="llm.queue", model=model)
+        with metrics.span("llm.call", model=model):
+            response = await llm_client.get_async_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                **params
+            )
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        metrics.inc("llm_tokens_total", usage.prompt_tokens or 0, model=model, direction="in")
+        metrics.inc("llm_tokens_total", usage.completion_tokens or 0, model=model, direction="out")
+    return response.choices[0].message.content.strip()
+
+async def acomplete(messages, model=LLM_MODEL, **params):
+    """Returns the completion text, sharing one upstream call among identical in-flight requests."""
+    key = request_key(model, messages, params)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_call(model, messages, params))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        metrics.inc("llm_coalesced_requests_total", model=model)
+    # ✅ Shield so one caller giving up does not cancel the call for the others
+    return await asyncio.shield(task)
+
+def complete(messages, model=LLM_MODEL, timeout=None, **params):
+    """Blocking wrapper around acomplete for the Streamlit script thread."""
+    future = asyncio.run_coroutine_threadsafe(acomplete(messages, model, **params), get_loop())
+    return future.result(timeout)
+
+class _Broadcast:
+    """Fans one upstream stream out to every subscriber queue; only touched from the event loop."""
+
+    def __init__(self):
+        self.chunks = []
+        self.queues = set()
+        self.done = False
+        self.task = None
+
+    def subscribe(self, q):
+        # ✅ Late joiners first get what has already arrived
+        for chunk in self.chunks:
+            q.put(chunk)
+        if self.done:
+            q.put(_STREAM_END)
+        else:
+            self.queues.add(q)
+
+    def unsubscribe(self, q):
+        self.queues.discard(q)
+        # ✅ Nobody is reading any more: stop the upstream call and free its slot
+        if not self.queues and not self.done and self.task is not None:
+            self.task.cancel()
+
+    def publish(self, chunk):
+        self.chunks.append(chunk)
+        for q in self.queues:
+            q.put(chunk)
+
+    def finish(self, error=None):
+        self.done = True
+        for q in self.queues:
+            q.put(error if error is not None else _STREAM_END)
+        self.queues.clear()
+
+async def _stream_call(key, broadcast, model, messages, params):
+    model_semaphore = _model_semaphore(model)
+    queued_at = time.perf_counter()
+    try:
+        async with _global_semaphore, model_semaphore:
+            metrics.observe("span_duration_seconds", time.perf_counter() - queued_at, span="llm.queue", model=model)
+            with metrics.span("llm.call", model=model):
+                stream = await llm_client.get_async_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                    **params
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        broadcast.publish(delta)
+        broadcast.finish()
+    except Exception as e:
+        broadcast.finish(e)
+    finally:
+        _streams.pop(key, None)
+
+async def _open_stream(q, model, messages, params):
+    """Subscribes q to the stream for this request, starting the upstream call unless one is in flight."""
+    key = request_key(model, messages, dict(params, stream=True))
+    broadcast = _streams.get(key)
+    if broadcast is None:
+        broadcast = _streams[key] = _Broadcast()
+        broadcast.task = asyncio.ensure_future(_stream_call(key, broadcast, model, messages, params))
+    else:
+        metrics.inc("llm_coalesced_requests_total", model=model)
+    broadcast.subscribe(q)
+    return broadcast
+
+def stream(messages, model=LLM_MODEL, timeout=None, **params):
+    """Yields completion text as it arrives, for the Streamlit script thread.
+
+    The upstream stream runs on the event loop under the same concurrency limits as complete(),
+    and identical in-flight requests share it; chunks reach this thread through a queue.
+    """
+    loop = get_loop()
+    q = queue.Queue()
+    broadcast = asyncio.run_coroutine_threadsafe(_open_stream(q, model, messages, params), loop).result(timeout)
+    try:
+        while True:
+            item = q.get(timeout=timeout)
+            if item is _STREAM_END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        loop.call_soon_threadsafe(broadcast.unsubscribe, q)
@@ -0,0 +1,72 @@
+import os
+import threading
+import httpx
+import groq
+from dotenv import load_dotenv
+
+# ✅ Load environment variables
+load_dotenv()
+
+# ✅ LLM connection settings (override through environment variables)
+LLM_MODEL = os.getenv("LLM_MODEL", "llama3-8b-8192")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+_lock = threading.Lock()
+_client = None
+_async_client = None
+
+def get_api_key():
+    """Reads the Groq API key from the environment, falling back to Streamlit secrets."""
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        try:
+            import streamlit as st
+            api_key = st.secrets["GROQ_API_KEY"]
+        except Exception:
+            api_key = None
+    if not api_key:
+        raise ValueError("Missing GROQ_API_KEY! Please set it in .env.")
+    return api_key
+
+def get_timeout():
+    return httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+def get_limits():
+    return httpx.Limits(
+        max_connections=LLM_POOL_SIZE,
+        max_keepalive_connections=LLM_POOL_SIZE,
+        keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+    )
+
+def get_client():
+    """Returns the process-wide Groq client, sharing one keep-alive connection pool."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = groq.Client(
+                    api_key=get_api_key(),
+                    base_url=GROQ_BASE_URL,
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=httpx.Client(timeout=get_timeout(), limits=get_limits()),
+                )
+    return _client
+
+def get_async_client():
+    """Returns the process-wide async Groq client; must only be used from the llm_async event loop."""
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = groq.AsyncClient(
+                    api_key=get_api_key(),
+                    base_url=GROQ_BASE_URL,
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=httpx.AsyncClient(timeout=get_timeout(), limits=get_limits()),
+                )
+    return _async_client
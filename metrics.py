@@ -0,0 +1,240 @@
+"""Lightweight in-process metrics: timing spans, counters and histograms.
+
+Everything is kept in memory behind one lock (a dict lookup and a few additions per event),
+so it is cheap enough to leave on in production. Export as Prometheus text through
+render_prometheus() / an optional /metrics endpoint, or as JSONL events to a local file.
+"""
+import os
+import json
+import time
+import atexit
+import bisect
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ✅ Metrics settings (override through environment variables)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# ✅ Port for a Prometheus /metrics endpoint; 0 disables it
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# ✅ Append span and counter events to this file as JSON lines; empty disables the sink
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+METRICS_MAX_BUFFERED_EVENTS = int(os.getenv("METRICS_MAX_BUFFERED_EVENTS", "10000"))
+
+# Latency buckets in seconds, from sub-millisecond DB reads to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_events = []
+_flusher = None
+_exporter = None
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _emit(event):
+    # Called with _lock held
+    global _flusher
+    if not METRICS_JSONL_PATH:
+        return
+    if len(_events) < METRICS_MAX_BUFFERED_EVENTS:
+        _events.append(event)
+    if _flusher is None:
+        _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+        _flusher.start()
+        atexit.register(flush)
+
+class Histogram:
+    """Cumulative-bucket histogram, the same shape Prometheus stores."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimates a quantile by linear interpolation inside the bucket that contains it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+def inc(name, value=1, **labels):
+    """Adds to a counter, e.g. inc("cache_requests_total", cache="response", result="hit")."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+        _emit({"ts": time.time(), "pid": os.getpid(), "type": "counter", "name": name, "value": value, "labels": labels})
+
+def observe(name, value, **labels):
+    """Records a value in a histogram."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(value)
+        _emit({"ts": time.time(), "pid": os.getpid(), "type": "histogram", "name": name, "value": value, "labels": labels})
+
+@contextmanager
+def span(name, **labels):
+    """Times a block into span_duration_seconds{span=name}; failures also count in span_errors_total."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc("span_errors_total", span=name, **labels)
+        raise
+    finally:
+        # Also runs for Streamlit's rerun/stop control flow, which is not an error
+        observe("span_duration_seconds", time.perf_counter() - start, span=name, **labels)
+
+def timed(name, **labels):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_cache(cache, result):
+    """Counts a cache lookup; result is "hit", "miss" or a cache-specific kind of hit."""
+    inc("cache_requests_total", cache=cache, result=result)
+
+def record_error(task):
+    """Counts a failure in background work (indexing, refills, flushes), which no request span sees."""
+    inc("background_errors_total", task=task)
+
+def snapshot():
+    """Returns counters and per-histogram count/sum/p50/p95/p99, for dashboards and benchmarks."""
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in _counters.items()]
+        histograms = [{
+            "name": name, "labels": dict(labels), "count": h.count, "sum": h.sum,
+            "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+        } for (name, labels), h in _histograms.items()]
+    return {"counters": counters, "histograms": histograms}
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _events.clear()
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+def render_prometheus():
+    """Returns all metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(_histograms.items(), key=lambda item: item[0])
+        histograms = [(key, list(h.buckets), list(h.counts), h.sum, h.count) for key, h in histograms]
+
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), buckets, counts, total, count in histograms:
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, n in zip(list(buckets) + ["+Inf"], counts):
+            cumulative += n
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+def flush():
+    """Appends buffered events to the JSONL sink."""
+    with _lock:
+        events = _events[:]
+        _events.clear()
+    if not events or not METRICS_JSONL_PATH:
+        return
+    directory = os.path.dirname(METRICS_JSONL_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # One write per flush keeps lines from concurrent workers from interleaving
+    data = "".join(json.dumps(event) + "\n" for event in events)
+    with open(METRICS_JSONL_PATH, "a", encoding="utf-8") as f:
+        f.write(data)
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            flush()
+        except Exception as e:
+            print(f"[metrics] JSONL flush failed: {e}")
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def start_exporter(port=None):
+    """Serves /metrics on a background thread (once per process); no-op unless a port is configured."""
+    global _exporter
+    port = METRICS_PORT if port is None else port
+    if not port or not METRICS_ENABLED:
+        return None
+    with _lock:
+        if _exporter is not None:
+            return _exporter
+        try:
+            _exporter = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        except OSError as e:
+            # ✅ Another worker on this host already owns the port
+            print(f"[metrics] Exporter not started on port {port}: {e}")
+            _exporter = False
+            return None
+    threading.Thread(target=_exporter.serve_forever, name="metrics-exporter", daemon=True).start()
+    return _exporter
@@ -0,0 +1,36 @@
+"""One-shot import of accounts from the legacy users.json into the users table.
+
+Usage:
+    python migrate_users.py --file users.json
+    python migrate_users.py --file users.json --archive   # rename the file afterwards
+
+Passwords are hashed on the way in; usernames already in the database are skipped,
+so running it twice is harmless.
+"""
+import os
+import json
+import argparse
+import auth
+
+def main():
+    parser = argparse.ArgumentParser(description="Import users.json into the users table")
+    parser.add_argument("--file", default="users.json")
+    parser.add_argument("--archive", action="store_true", help="Rename the file to <file>.migrated when done")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"Nothing to migrate: {args.file} not found")
+        return
+
+    with open(args.file, "r") as f:
+        users = json.load(f)
+
+    added = auth.import_users(users)
+    print(f"✅ Imported {added} of {len(users)} users from {args.file}")
+
+    if args.archive:
+        os.replace(args.file, args.file + ".migrated")
+        print(f"Archived {args.file} as {args.file}.migrated")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+
+# ✅ Cache location and size budget (override through environment variables)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(".cache", "pdf_text"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+_lock = threading.Lock()
+
+def document_hash(data):
+    """Returns the SHA-256 hex digest of the raw PDF bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+def _cache_path(doc_hash):
+    return os.path.join(PDF_CACHE_DIR, f"{doc_hash}.json")
+
+def load_pages(doc_hash):
+    """Returns the cached per-page text for a document, or None on a miss."""
+    path = _cache_path(doc_hash)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            pages = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # ✅ Touch the entry so eviction treats it as recently used
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return pages
+
+def save_pages(doc_hash, pages):
+    """Stores per-page text for a document and evicts old entries if over budget."""
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+    # ✅ Write to a temp file first so readers never see a half-written entry
+    fd, tmp_path = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False)
+        os.replace(tmp_path, _cache_path(doc_hash))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+
+    evict()
+
+def evict(max_bytes=None):
+    """Removes least recently used entries until the cache fits in max_bytes."""
+    max_bytes = PDF_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    with _lock:
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(PDF_CACHE_DIR)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(PDF_CACHE_DIR, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,110 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import fitz  # PyMuPDF for PDF processing
+import metrics
+
+# ✅ Parallel extraction settings (override through environment variables)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+# ✅ Largest range handed to one worker, so pages keep arriving steadily however long the document is
+PDF_RANGE_PAGES = int(os.getenv("PDF_RANGE_PAGES", "32"))
+
+# This module is imported by pool workers, so it must stay free of Streamlit side effects.
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Returns the process-wide extraction pool, shared by every upload.
+
+    Workers are spawned rather than forked: extraction is started from a background thread of a
+    multi-threaded server process, and forking that is unsafe.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _reset_pool(pool):
+    """Drops a broken pool so the next extraction starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def extract_page_range(data, start, stop):
+    """Extracts text for pages [start, stop) from PDF bytes."""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+
+def page_ranges(page_count, parts, start=0):
+    """Splits pages [start, page_count) into at most `parts` contiguous ranges."""
+    pages = page_count - start
+    if pages <= 0:
+        return []
+    parts = max(1, min(parts, pages))
+    size, extra = divmod(pages, parts)
+    ranges = []
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+def page_count(data):
+    """Returns the number of pages in a PDF."""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return doc.page_count
+
+def iter_pages(data, workers=None, min_pages=None, first_pages=0):
+    """Yields per-page text in order as soon as each page (or page range) is extracted.
+
+    The first `first_pages` pages are extracted in this thread while the pool works on the rest,
+    so they arrive at the same time for a short document and a long one.
+    """
+    workers = PDF_WORKERS if workers is None else workers
+    min_pages = PDF_PARALLEL_MIN_PAGES if min_pages is None else min_pages
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        count = doc.page_count
+        if workers <= 1 or count < min_pages:
+            for page in doc:
+                yield page.get_text("text")
+            return
+
+        first = max(0, min(first_pages, count))
+        parts = max(workers, -(-(count - first) // PDF_RANGE_PAGES))
+        pool = get_pool()
+        futures = []
+        yielded = 0
+        try:
+            for start, stop in page_ranges(count, parts, first):
+                futures.append(pool.submit(extract_page_range, data, start, stop))
+            for i in range(first):
+                yield doc[i].get_text("text")
+                yielded += 1
+            # ✅ Yield ranges in submission order so pages stay in order
+            for future in futures:
+                pages = future.result()
+                yield from pages
+                yielded += len(pages)
+        except BrokenProcessPool:
+            # ✅ A worker died (e.g. MuPDF crashing on a bad file): replace the pool for later
+            # uploads and finish this one in-process
+            metrics.inc("pdf_pool_restarts_total")
+            _reset_pool(pool)
+            for i in range(yielded, count):
+                yield doc[i].get_text("text")
+        finally:
+            # ✅ Drop queued ranges if the caller stops early
+            for future in futures:
+                future.cancel()
+
+def extract_pages(data, workers=None, min_pages=None):
+    """Extracts per-page text, splitting large documents across a process pool."""
+    return list(iter_pages(data, workers, min_pages))
@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import OrderedDict
+import metrics
+import pdf_cache
+import pdf_extract
+
+# ✅ Pages that must be extracted before an upload becomes usable
+PDF_EARLY_PAGES = int(os.getenv("PDF_EARLY_PAGES", "5"))
+# ✅ Finished jobs kept in memory; older ones are reloaded from the disk cache
+MAX_FINISHED_JOBS = int(os.getenv("PDF_MAX_FINISHED_JOBS", "32"))
+
+class IngestJob:
+    """Extracts a PDF page by page on a background thread, exposing pages as they arrive."""
+
+    def __init__(self, doc_hash, total_pages=None, pages=None):
+        self.doc_hash = doc_hash
+        self.total_pages = total_pages
+        self.pages = list(pages) if pages is not None else []
+        self.done = pages is not None
+        self.error = None
+        self._text = ""
+        self._text_pages = 0
+        self._callbacks = []
+        self._cond = threading.Condition()
+
+    def run(self, data):
+        try:
+            with metrics.span("pdf.ingest"):
+                for page in pdf_extract.iter_pages(data, first_pages=PDF_EARLY_PAGES):
+                    with self._cond:
+                        self.pages.append(page)
+                        self._cond.notify_all()
+                pdf_cache.save_pages(self.doc_hash, self.pages)
+            metrics.inc("pdf_pages_total", len(self.pages))
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+                callbacks, self._callbacks = self._callbacks, []
+            _mark_finished(self)
+            if self.error is None:
+                for callback in callbacks:
+                    callback(self)
+
+    def add_done_callback(self, callback):
+        """Calls callback(job) once extraction has finished (immediately if it already has)."""
+        with self._cond:
+            if not self.done:
+                if callback not in self._callbacks:
+                    self._callbacks.append(callback)
+                return
+        if self.error is None:
+            callback(self)
+
+    def wait_for_pages(self, count, timeout=None):
+        """Blocks until `count` pages are available or extraction has finished."""
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self.pages) >= count or self.done, timeout)
+
+    def text(self):
+        """Returns the text extracted so far.
+
+        The joined string is cached, so every session reading the same document shares one copy.
+        """
+        with self._cond:
+            if self._text_pages != len(self.pages):
+                self._text = "".join(page + "\n" for page in self.pages)
+                self._text_pages = len(self.pages)
+            return self._text
+
+_lock = threading.Lock()
+_running = {}
+_finished = OrderedDict()
+
+def _mark_finished(job):
+    with _lock:
+        _running.pop(job.doc_hash, None)
+        # ✅ Failed jobs are kept too, so the error is shown instead of re-extracting on every rerun
+        _finished[job.doc_hash] = job
+        _finished.move_to_end(job.doc_hash)
+        while len(_finished) > MAX_FINISHED_JOBS:
+            _finished.popitem(last=False)
+
+def get_job(doc_hash):
+    """Returns the running or finished job for a document hash, if any."""
+    with _lock:
+        if doc_hash in _running:
+            return _running[doc_hash]
+        if doc_hash in _finished:
+            _finished.move_to_end(doc_hash)
+            return _finished[doc_hash]
+
+    pages = pdf_cache.load_pages(doc_hash)
+    if pages is None:
+        return None
+    job = IngestJob(doc_hash, total_pages=len(pages), pages=pages)
+    _mark_finished(job)
+    return job
+
+def start_ingestion(data, retry=False):
+    """Starts (or re-attaches to) background extraction of the given PDF bytes.
+
+    A failed job is returned as is, so its error can be shown, unless retry is set
+    (the file was uploaded again); then it is replaced by a fresh attempt.
+    """
+    doc_hash = pdf_cache.document_hash(data)
+
+    job = get_job(doc_hash)
+    if job is not None and not (retry and job.done and job.error is not None):
+        return job
+
+    try:
+        total_pages = pdf_extract.page_count(data)
+    except Exception as e:
+        # ✅ Corrupt or encrypted uploads fail here; report them like any other failed extraction
+        job = IngestJob(doc_hash, total_pages=0, pages=[])
+        job.error = e
+        _mark_finished(job)
+        return job
+
+    with _lock:
+        # ✅ Another session may have started the same document meanwhile
+        job = _running.get(doc_hash)
+        if job is not None:
+            return job
+        _finished.pop(doc_hash, None)
+        job = IngestJob(doc_hash, total_pages=total_pages)
+        _running[doc_hash] = job
+
+    threading.Thread(target=job.run, args=(data,), daemon=True).start()
+    return job
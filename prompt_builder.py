@@ -0,0 +1,189 @@
+import os
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import chat_history
+import llm_async
+import metrics
+import retrieval
+
+# ✅ Prompt budget settings, in tokens (override through environment variables)
+LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", "8192"))
+PROMPT_RESERVED_OUTPUT_TOKENS = int(os.getenv("PROMPT_RESERVED_OUTPUT_TOKENS", "1024"))
+PROMPT_HISTORY_TOKENS = int(os.getenv("PROMPT_HISTORY_TOKENS", "1500"))
+PROMPT_SUMMARY_TOKENS = int(os.getenv("PROMPT_SUMMARY_TOKENS", "300"))
+# ✅ Cap on retrieved reference text, so prompt cost stays predictable even with a large context window
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "3000"))
+# ✅ Retrieved chunks considered for packing, best first
+PROMPT_MAX_CHUNKS = int(os.getenv("PROMPT_MAX_CHUNKS", "12"))
+# ✅ Turns kept verbatim; once this many more have piled up they are folded into the summary
+PROMPT_RECENT_TURNS = int(os.getenv("PROMPT_RECENT_TURNS", "6"))
+PROMPT_SUMMARY_BATCH = int(os.getenv("PROMPT_SUMMARY_BATCH", "4"))
+# ✅ Local tokenizer; Groq's Llama tokenizer differs slightly, so budgets keep some headroom
+PROMPT_ENCODING = os.getenv("PROMPT_ENCODING", "cl100k_base")
+
+SYSTEM_PROMPT = "You are an AI tutor. Answer clearly and concisely."
+# Per-message framing tokens added by the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+CHUNK_SEPARATOR = "\n\n---\n\n"
+
+_encoding = None
+_encoding_lock = threading.Lock()
+# ✅ Summaries are folded in the background; results wait here, keyed by chat session, until its next question
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+_pending_summaries = OrderedDict()
+_pending_lock = threading.Lock()
+MAX_PENDING_SUMMARIES = 1024
+
+def get_encoding():
+    """Returns the tiktoken encoding, or False if it cannot be loaded (e.g. offline without a cached BPE file)."""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(PROMPT_ENCODING)
+                except Exception as e:
+                    print(f"[prompt_builder] Tokenizer unavailable, estimating 4 characters per token: {e}")
+                    _encoding = False
+    return _encoding
+
+def count_tokens(text):
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+def truncate_to_tokens(text, max_tokens):
+    """Cuts text down to at most max_tokens tokens."""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    if encoding:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+def pack_chunks(chunks, budget):
+    """Adds chunks in rank order while they fit; the best chunk is truncated rather than dropped."""
+    packed, used = [], 0
+    separator = count_tokens(CHUNK_SEPARATOR)
+    for chunk in chunks:
+        cost = count_tokens(chunk) + (separator if packed else 0)
+        if used + cost <= budget:
+            packed.append(chunk)
+            used += cost
+        elif not packed:
+            packed.append(truncate_to_tokens(chunk, budget))
+            break
+    return CHUNK_SEPARATOR.join(packed)
+
+def select_turns(turns, budget):
+    """Returns the most recent turns (oldest first) that fit in the budget as user/assistant messages."""
+    messages, used = [], 0
+    for turn in reversed(turns):
+        pair = [{"role": "user", "content": turn["question"]},
+                {"role": "assistant", "content": turn["answer"]}]
+        cost = sum(message_tokens(m) for m in pair)
+        if used + cost > budget:
+            break
+        messages[:0] = pair
+        used += cost
+    return messages
+
+def build_messages(question, text="", history=None, summary="", context_limit=LLM_CONTEXT_TOKENS, doc_hash=None):
+    """Assembles system prompt, rolling summary, recent turns, retrieved context and the question within budget.
+
+    Priority when space runs out: the question, then the summary, then recent turns
+    (up to PROMPT_HISTORY_TOKENS), and retrieved context fills what is left (up to PROMPT_CONTEXT_TOKENS).
+    """
+    budget = context_limit - PROMPT_RESERVED_OUTPUT_TOKENS
+    system = SYSTEM_PROMPT
+    if summary:
+        system += f"\nSummary of the earlier conversation:\n{truncate_to_tokens(summary, PROMPT_SUMMARY_TOKENS)}"
+
+    question_message = {"role": "user", "content": question}
+    budget -= message_tokens({"content": system}) + message_tokens(question_message)
+
+    turns = select_turns(history or [], min(PROMPT_HISTORY_TOKENS, max(budget, 0)))
+    budget -= sum(message_tokens(m) for m in turns)
+
+    reference_intro = "\nUse the following reference:\n"
+    budget = min(budget - count_tokens(reference_intro), PROMPT_CONTEXT_TOKENS)
+    if budget > 0:
+        reference = pack_chunks(retrieval.retrieve(question, text, PROMPT_MAX_CHUNKS, doc_hash), budget)
+        if reference:
+            system += reference_intro + reference
+
+    return [{"role": "system", "content": system}] + turns + [question_message]
+
+def summarize(summary, turns):
+    """Folds turns into the running summary with one LLM call."""
+    transcript = "\n".join(f"Student: {t['question']}\nTutor: {t['answer']}" for t in turns)
+    prompt = (
+        f"Update the summary of a tutoring conversation. Keep it under {PROMPT_SUMMARY_TOKENS} tokens, "
+        "keep topics, facts and open questions, drop pleasantries. Return only the summary.\n\n"
+        f"Current summary:\n{summary or '(none)'}\n\nNew exchanges:\n{transcript}"
+    )
+    return llm_async.complete([{"role": "system", "content": prompt}]).strip()
+
+def _apply_pending_summary(state):
+    """Moves a finished background summary into the session."""
+    session = state.get("chat_session_id")
+    with _pending_lock:
+        pending = _pending_summaries.get(session)
+        if pending is None or not pending[0].done():
+            return
+        del _pending_summaries[session]
+    future, fold_until = pending
+    try:
+        state["chat_summary"], state["chat_summary_turns"] = future.result(), fold_until
+    except Exception as e:
+        # ✅ Answering matters more than the summary; the turns are folded again next time
+        metrics.record_error("prompt_builder.summary")
+        print(f"[prompt_builder] Summary update failed: {e}")
+
+def update_summary(state):
+    """Starts folding older turns into the summary once a batch is due; call after a turn is appended.
+
+    The LLM call runs on a background thread, so it never delays an answer; until it finishes,
+    questions use the previous summary.
+    """
+    _apply_pending_summary(state)
+    total = chat_history.turn_count(state)
+    covered = state.get("chat_summary_turns", 0)
+    if total - covered < PROMPT_RECENT_TURNS + PROMPT_SUMMARY_BATCH:
+        return
+
+    session = state.get("chat_session_id")
+    with _pending_lock:
+        if session in _pending_summaries:
+            return
+    fold_until = total - PROMPT_RECENT_TURNS
+    # Turns are read here, on the script thread, since the session state belongs to it
+    turns = chat_history.load_turns(state, covered, fold_until)
+    future = _summary_executor.submit(summarize, state.get("chat_summary", ""), turns)
+    with _pending_lock:
+        _pending_summaries[session] = (future, fold_until)
+        while len(_pending_summaries) > MAX_PENDING_SUMMARIES:
+            _pending_summaries.popitem(last=False)
+
+def conversation_memory(state):
+    """Returns (summary, recent_turns) for a chat session without waiting on the LLM.
+
+    The summary and how many turns it covers are kept in the session, so older turns are
+    summarized once, in batches (see update_summary), instead of being resent every question.
+    """
+    _apply_pending_summary(state)
+    total = chat_history.turn_count(state)
+    covered = state.get("chat_summary_turns", 0)
+    summary = state.get("chat_summary", "")
+    recent = chat_history.load_turns(state, max(covered, total - PROMPT_RECENT_TURNS - PROMPT_SUMMARY_BATCH), total)
+    return summary, recent
@@ -1,12 +1,14 @@
 import streamlit as st
 import json
-import re
 import database 
-import ai 
-import groq  
-
-# ✅ Load API key from Streamlit secrets
-client = groq.Client(api_key=st.secrets["GROQ_API_KEY"])
+import attempt_writer
+import retrieval
+import llm_async
+import metrics
+import quiz_pool
+import quiz_generator
+import quiz_parser
+from utils import get_pdf_text, current_pdf_job
 
 # ✅ Ensure all required session state variables are initialized
 for key, default in {
@@ -15,48 +17,52 @@ for key, default in {
     "quiz_finished": False,
     "score": 0,
     "user_answers": {},
-    "pdf_text": "",
 }.items():
     if key not in st.session_state:
         st.session_state[key] = default
 
 def extract_json_from_response(response_text):
-    """Extract JSON from AI response and fix formatting issues."""
-    match = re.search(r"\[\s*{.*}\s*\]", response_text, re.DOTALL)
-    return match.group(0).strip() if match else None
+    """Extract JSON from AI response, salvaging every valid question even if the array is broken."""
+    questions = quiz_parser.parse_questions(response_text)
+    return json.dumps(questions) if questions else None
 
 def generate_quiz():
     """Generate quiz questions from AI and store them in session state."""
-    if "pdf_text" not in st.session_state or not st.session_state["pdf_text"]:
+    pdf_text = get_pdf_text()
+    if not pdf_text:
         st.error("❌ No PDF text found. Please upload a PDF first.")
         return
     
     st.session_state["quiz_questions"] = []  # Clear previous quiz
     st.session_state["quiz_started"] = False
+    quiz_size = st.session_state.get("quiz_question_count", quiz_generator.QUIZ_SIZE)
+
+    # ✅ Draw from the pre-generated pool when possible, topping it up in the background
+    doc_hash = st.session_state.get("pdf_hash")
+    if doc_hash:
+        pooled = quiz_pool.draw(doc_hash, quiz_size)
+        # ✅ Only refill from the whole document; uploads still being extracted are filled by the
+        # ingestion callback once every page is in, so the pool is not built from the first pages
+        job = current_pdf_job()
+        if job is not None and job.done and job.error is None:
+            quiz_pool.ensure_pool(doc_hash, job.text())
+        if pooled:
+            st.session_state["quiz_questions"] = pooled
+            st.session_state["quiz_started"] = True
+            st.rerun()
     
     st.info("🔄 Fetching quiz questions from AI...")
 
-    response_text = ai.get_quiz_questions(st.session_state["pdf_text"])  # AI call
-
-    # 🔍 Debug: Check Raw AI Response
-    st.session_state["raw_ai_response"] = response_text  
-
-    response_text = extract_json_from_response(response_text)
+    # ✅ Generate section by section in parallel so the quiz covers the whole document
+    quiz_data = quiz_generator.generate_questions(pdf_text, quiz_size)
 
-    if response_text:
-        try:
-            quiz_data = json.loads(response_text)  # ✅ Parse JSON safely
-            if isinstance(quiz_data, list):  # Ensure it's a list
-                st.session_state["quiz_questions"] = quiz_data
-                st.session_state["quiz_started"] = True
-                st.success("✅ Quiz questions generated!")
-                st.rerun()
-            else:
-                st.error("❌ AI response was not in expected list format.")
-        except json.JSONDecodeError:
-            st.error("❌ AI returned invalid JSON. Please retry.")
+    if quiz_data:
+        st.session_state["quiz_questions"] = quiz_data
+        st.session_state["quiz_started"] = True
+        st.success("✅ Quiz questions generated!")
+        st.rerun()
     else:
-        st.error("❌ AI response did not contain valid JSON!")
+        st.error("❌ AI response did not contain valid quiz questions. Please retry.")
 
 def quiz_ui():
     """Handles the quiz UI and user interactions."""
@@ -77,8 +83,14 @@ def quiz_ui():
 
     # ✅ Start Quiz Button
     if not st.session_state["quiz_started"]:
+        st.number_input("Number of questions", min_value=1, max_value=50,
+                        value=quiz_generator.QUIZ_SIZE, key="quiz_size")
+        st.text_input("Course", value=database.DEFAULT_COURSE, key="course")
         if st.button("📝 Start Quiz"):
             st.session_state["quiz_started"] = True  # Mark quiz as started
+            # ✅ Keep the course and size past this run; the inputs' own state goes away once they are hidden
+            st.session_state["quiz_course"] = database.normalize_course(st.session_state.get("course"))
+            st.session_state["quiz_question_count"] = st.session_state.get("quiz_size", quiz_generator.QUIZ_SIZE)
             generate_quiz()  # Generate new quiz
             st.rerun()  # Refresh UI to show questions
 
@@ -127,23 +139,33 @@ def quiz_ui():
         total_questions = len(st.session_state["quiz_questions"])
         st.success(f"🏆 Your Score: **{score} / {total_questions}**")
 
+    # 🔄 Restart Quiz Button
+    if st.button("🔄 Restart Quiz"):
+        st.session_state["quiz_started"] = False
+        st.session_state["quiz_questions"] = []
+        st.session_state["quiz_finished"] = False
+        st.session_state["quiz_submitted"] = False
+        st.session_state["user_answers"] = {}
+        st.session_state["score"] = 0
+
+        # ✅ Regenerate quiz questions
+        generate_quiz()
+
+        # ✅ Refresh the UI
+        st.rerun()
+
 
 def get_quiz_questions(pdf_text):
     """Calls AI to generate quiz questions from the given text."""
+    excerpt = "\n\n".join(retrieval.representative_chunks(pdf_text))
     prompt = (
-        f"Generate exactly 5 multiple-choice questions from this text:\n{pdf_text[:2000]}\n"
+        f"Generate exactly 5 multiple-choice questions from this text:\n{excerpt}\n"
         "Return a JSON array in this format:\n"
         '[{"question": "What is AI?", "options": ["A) Artificial Intelligence", "B) Machine Learning", "C) Deep Learning", "D) Neural Networks"], "answer": "A) Artificial Intelligence"}]\n'
         "DO NOT include explanations, markdown, or extra text. Return JSON only."
     )
 
-    response = client.chat.completions.create(
-        model="llama3-8b-8192",
-        messages=[{"role": "system", "content": prompt}]
-    )
-
-    response_text = response.choices[0].message.content.strip()
-    print("🔍 [DEBUG] AI Raw Response:", response_text)  # Debugging AI Response
+    response_text = llm_async.complete([{"role": "system", "content": prompt}])
 
     return response_text  # Return raw response for debugging
 
@@ -165,27 +187,16 @@ def submit_quiz():
         score = st.session_state["score"]
         total_questions = len(st.session_state["quiz_questions"])
         
-        # Debug print
-        print(f"[DEBUG] Saving score for user '{username}': {score}/{total_questions}")
-        
-        database.save_quiz_score(username, score, total_questions)
+        answers = [st.session_state.get(f"q{idx+1}") for idx in range(total_questions)]
+
+        metrics.inc("quiz_submissions_total", saved="true")
+
+        # ✅ Score and every answer go to the database in a single transaction
+        attempt_writer.record_quiz(username, st.session_state["quiz_questions"], answers, score,
+                                   course=st.session_state.get("quiz_course"))
     else:
         st.warning("⚠️ You must be logged in to save your quiz score.")
-        print("[DEBUG] Username not found in session. Score not saved.")
+        metrics.inc("quiz_submissions_total", saved="false")
 
 
     st.success(f"✅ Your Score: {st.session_state['score']} / {len(st.session_state['quiz_questions'])}")
-
-# 🔄 Restart Quiz Button
-if st.button("🔄 Restart Quiz"):
-    st.session_state["quiz_started"] = False
-    st.session_state["quiz_questions"] = []
-    st.session_state["quiz_finished"] = False
-    st.session_state["user_answers"] = {}
-    st.session_state["score"] = 0
-
-    # ✅ Regenerate quiz questions
-    generate_quiz()
-
-    # ✅ Refresh the UI
-    st.rerun()
@@ -0,0 +1,81 @@
+import os
+import math
+from concurrent.futures import ThreadPoolExecutor
+import ai
+import metrics
+import quiz_parser
+import retrieval
+from quiz_parser import question_key
+
+# ✅ Quiz generation settings (override through environment variables)
+QUIZ_SIZE = int(os.getenv("QUIZ_SIZE", "5"))
+QUIZ_SECTION_CHARS = int(os.getenv("QUIZ_SECTION_CHARS", "3000"))
+QUIZ_QUESTIONS_PER_SECTION = int(os.getenv("QUIZ_QUESTIONS_PER_SECTION", "5"))
+QUIZ_GENERATION_WORKERS = int(os.getenv("QUIZ_GENERATION_WORKERS", "8"))
+QUIZ_MAX_ATTEMPTS = int(os.getenv("QUIZ_MAX_ATTEMPTS", "3"))
+
+def split_sections(text, max_sections):
+    """Splits text into at most max_sections sections spread evenly across the document."""
+    return split_evenly(retrieval.chunk_text(text, chunk_size=QUIZ_SECTION_CHARS, overlap=0), max_sections)
+
+def split_evenly(items, count):
+    """Picks at most `count` items spread evenly across the list."""
+    if len(items) <= count:
+        return items
+    step = len(items) / count
+    return [items[int(i * step)] for i in range(count)]
+
+def generate_questions(text, num_questions=QUIZ_SIZE, max_workers=QUIZ_GENERATION_WORKERS):
+    """Generates up to num_questions de-duplicated questions covering the whole document.
+
+    Each section is requested concurrently, so wall-clock time stays close to one round-trip.
+    Questions dropped as duplicates across sections are replaced in one top-up round.
+    """
+    sections = split_sections(text, max(1, math.ceil(num_questions / QUIZ_QUESTIONS_PER_SECTION)))
+    if not sections:
+        return []
+
+    def generate(request):
+        section, count = request
+        try:
+            # ✅ Salvage what parses and re-request only the missing questions
+            return quiz_parser.request_questions(
+                lambda missing: ai.get_quiz_questions(section, missing), count, QUIZ_MAX_ATTEMPTS)
+        except Exception as e:
+            metrics.record_error("quiz_generator.section")
+            print(f"[quiz_generator] Section request failed: {e}")
+            return []
+
+    questions = []
+    seen = set()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sections))) as executor:
+        per_section = math.ceil(num_questions / len(sections))
+        collect(executor.map(generate, [(section, per_section) for section in sections]), questions, seen, num_questions)
+
+        # ✅ Top up what de-duplication dropped, spreading the request across the document
+        missing = num_questions - len(questions)
+        if missing > 0:
+            picked = split_evenly(sections, missing)
+            per_section = math.ceil(missing / len(picked))
+            collect(executor.map(generate, [(section, per_section) for section in picked]), questions, seen, num_questions)
+    return questions
+
+def collect(results, questions, seen, limit):
+    """Adds unseen questions from per-section results until there are `limit` of them.
+
+    Sections are interleaved, so a short quiz still samples the whole document.
+    """
+    for question in round_robin(list(results)):
+        if len(questions) >= limit:
+            break
+        key = question_key(question)
+        if key not in seen:
+            seen.add(key)
+            questions.append(question)
+
+def round_robin(lists):
+    """Yields items round-robin: the first of each list, then the second of each, and so on."""
+    for i in range(max((len(items) for items in lists), default=0)):
+        for items in lists:
+            if i < len(items):
+                yield items[i]
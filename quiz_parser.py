@@ -0,0 +1,157 @@
+import re
+import json
+import hashlib
+
+# ✅ Schema every quiz question must satisfy
+MIN_OPTIONS = 2
+MAX_OPTIONS = 6
+
+_letter_answer = re.compile(r"^\(?([A-Fa-f])\)?[.)]?$")
+
+def _scan_object(text, start):
+    """Scans the object opening at `start`.
+
+    Returns (end, child): end is the index just past its closing '}' (-1 if it is unfinished),
+    child the index of the first object nested directly inside it (-1 if none), both ignoring
+    braces inside strings.
+    """
+    depth = 0
+    child = -1
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+            if depth == 2 and child == -1:
+                child = i
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1, child
+    return -1, child
+
+class IncrementalQuestionParser:
+    """Pulls complete question objects out of (possibly partial or malformed) LLM output.
+
+    Text can be fed in pieces as it streams in; every object that has fully arrived is
+    returned once, and broken objects are skipped instead of failing the whole response.
+    Wrapper objects such as {"questions": [...]} are looked into, so the questions inside them
+    are returned one by one as they complete.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+
+    def feed(self, text, final=False):
+        """Adds more text and returns the objects completed by it.
+
+        With final=True an unfinished trailing object is given up on, so anything after it
+        (e.g. when a stray quote confused the scan) can still be salvaged.
+        """
+        self.buffer += text
+        objects = []
+        while True:
+            start = self.buffer.find("{", self.pos)
+            if start == -1:
+                self.pos = len(self.buffer)
+                break
+            end, child = _scan_object(self.buffer, start)
+            if end == -1:
+                if child != -1:
+                    # ✅ Unfinished wrapper, take the nested objects that have arrived so far
+                    self.pos = child
+                    continue
+                if not final:
+                    # ✅ Object is still arriving, wait for more text
+                    self.pos = start
+                    break
+                self.pos = start + 1
+                continue
+            try:
+                obj = json.loads(self.buffer[start:end])
+            except json.JSONDecodeError:
+                # ✅ Malformed object, resume scanning after its opening brace
+                self.pos = start + 1
+                continue
+            if child != -1 and validate_question(obj) is None:
+                # ✅ Not a question itself, but it holds objects that may be
+                self.pos = child
+                continue
+            objects.append(obj)
+            self.pos = end
+        return objects
+
+def iter_objects(text):
+    """Yields every complete JSON object found in text, looking inside wrappers that are not questions."""
+    yield from IncrementalQuestionParser().feed(text or "", final=True)
+
+def validate_question(obj):
+    """Returns a cleaned copy of a question object, or None if it does not match the schema."""
+    if not isinstance(obj, dict):
+        return None
+    question, options, answer = obj.get("question"), obj.get("options"), obj.get("answer")
+    if not isinstance(question, str) or not question.strip():
+        return None
+    if not isinstance(options, list) or not MIN_OPTIONS <= len(options) <= MAX_OPTIONS:
+        return None
+    if not all(isinstance(o, str) and o.strip() for o in options):
+        return None
+    if not isinstance(answer, str):
+        return None
+
+    options = [o.strip() for o in options]
+    answer = answer.strip()
+    if answer not in options:
+        # ✅ Accept a bare letter ("B", "b)") when options are labelled "B) ..."
+        match = _letter_answer.match(answer)
+        labelled = [o for o in options if match and o.upper().startswith(match.group(1).upper() + ")")]
+        if len(labelled) != 1:
+            return None
+        answer = labelled[0]
+
+    return {"question": question.strip(), "options": options, "answer": answer}
+
+def question_key(q):
+    """Returns a hash of the normalized question text, used for de-duplication."""
+    normalized = re.sub(r"\s+", " ", q["question"].strip().lower())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def parse_questions(response_text):
+    """Returns the valid, de-duplicated question objects salvaged from a raw AI response."""
+    questions = []
+    seen = set()
+    for obj in iter_objects(response_text):
+        question = validate_question(obj)
+        if question is None:
+            continue
+        key = question_key(question)
+        if key not in seen:
+            seen.add(key)
+            questions.append(question)
+    return questions
+
+def request_questions(request_fn, count, max_attempts=3):
+    """Calls request_fn(n) until `count` valid questions are collected, asking only for the missing ones."""
+    questions = []
+    seen = set()
+    for _ in range(max_attempts):
+        missing = count - len(questions)
+        if missing <= 0:
+            break
+        for question in parse_questions(request_fn(missing)):
+            key = question_key(question)
+            if key not in seen and len(questions) < count:
+                seen.add(key)
+                questions.append(question)
+    return questions
@@ -0,0 +1,75 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import database
+import metrics
+import quiz_generator
+from quiz_generator import QUIZ_SIZE
+from quiz_parser import question_key
+
+# ✅ Pool sizing (override through environment variables)
+QUIZ_POOL_TARGET = int(os.getenv("QUIZ_POOL_TARGET", "25"))
+QUIZ_POOL_LOW_WATERMARK = int(os.getenv("QUIZ_POOL_LOW_WATERMARK", "10"))
+QUIZ_POOL_WORKERS = int(os.getenv("QUIZ_POOL_WORKERS", "2"))
+# ✅ Generation rounds per refill, so a model that keeps repeating itself cannot loop forever
+QUIZ_POOL_MAX_ROUNDS = int(os.getenv("QUIZ_POOL_MAX_ROUNDS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=QUIZ_POOL_WORKERS, thread_name_prefix="quiz-pool")
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+def pool_size(doc_hash):
+    with database.get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM quiz_pool WHERE doc_hash = ?", (doc_hash,)).fetchone()[0]
+
+def add_questions(doc_hash, questions):
+    """Adds validated questions to the pool, skipping duplicates; returns how many were new."""
+    with database.transaction() as conn:
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO quiz_pool (doc_hash, question_key, question) VALUES (?, ?, ?)",
+                         [(doc_hash, question_key(q), json.dumps(q)) for q in questions])
+        return conn.total_changes - before
+
+def draw(doc_hash, count=QUIZ_SIZE):
+    """Atomically removes and returns `count` random questions, or [] if the pool is too small."""
+    with database.transaction(immediate=True) as conn:
+        rows = conn.execute("SELECT id, question FROM quiz_pool WHERE doc_hash = ? ORDER BY RANDOM() LIMIT ?",
+                            (doc_hash, count)).fetchall()
+        if len(rows) < count:
+            metrics.record_cache("quiz_pool", "miss")
+            return []
+        conn.executemany("DELETE FROM quiz_pool WHERE id = ?", [(row[0],) for row in rows])
+    metrics.record_cache("quiz_pool", "hit")
+    return [json.loads(row[1]) for row in rows]
+
+def _refill(doc_hash, text):
+    try:
+        needed = QUIZ_POOL_TARGET - pool_size(doc_hash)
+        for _ in range(QUIZ_POOL_MAX_ROUNDS):
+            if needed <= 0:
+                break
+            questions = quiz_generator.generate_questions(text, needed)
+            needed -= add_questions(doc_hash, questions)
+    except Exception as e:
+        metrics.record_error("quiz_pool.refill")
+        print(f"[quiz_pool] Refill failed for {doc_hash[:12]}: {e}")
+    finally:
+        with _refilling_lock:
+            _refilling.discard(doc_hash)
+
+def ensure_pool(doc_hash, text):
+    """Schedules a background refill when the pool for a document is below the low watermark."""
+    if not doc_hash or not text:
+        return
+    with _refilling_lock:
+        if doc_hash in _refilling:
+            return
+        if pool_size(doc_hash) >= QUIZ_POOL_LOW_WATERMARK:
+            return
+        _refilling.add(doc_hash)
+    _executor.submit(_refill, doc_hash, text)
+
+def prefill(job):
+    """Ingestion callback: starts filling the pool as soon as a document is fully extracted."""
+    ensure_pool(job.doc_hash, job.text())
@@ -0,0 +1,107 @@
+import os
+import re
+import time
+import hashlib
+import threading
+import numpy as np
+import database
+import metrics
+import retrieval
+
+# ✅ Response cache settings (override through environment variables)
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "50000"))
+RESPONSE_CACHE_SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "1") == "1"
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+# ✅ Candidates compared per semantic lookup (most recently used first)
+RESPONSE_CACHE_SCAN_LIMIT = int(os.getenv("RESPONSE_CACHE_SCAN_LIMIT", "2000"))
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "semantic_hits": 0, "misses": 0}
+
+def normalize_question(question):
+    """Lowercases, collapses whitespace and drops trailing punctuation."""
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip("?!. ")
+
+def context_hash(context):
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+def cache_key(question, model, ctx_hash):
+    raw = f"{model}\x00{ctx_hash}\x00{normalize_question(question)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+    metrics.record_cache("response", {"hits": "hit", "semantic_hits": "semantic_hit", "misses": "miss"}[name])
+
+def get_stats():
+    """Returns hit/miss counters for this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["semantic_hits"] + stats["misses"]
+    stats["hit_rate"] = (stats["hits"] + stats["semantic_hits"]) / lookups if lookups else 0.0
+    return stats
+
+def _touch(key, now):
+    with database.transaction() as conn:
+        conn.execute("UPDATE response_cache SET last_used_at = ? WHERE cache_key = ?", (now, key))
+
+def lookup(question, model, context=""):
+    """Returns a cached response for the question, or None on a miss."""
+    now = time.time()
+    ctx_hash = context_hash(context)
+    key = cache_key(question, model, ctx_hash)
+    min_created = now - RESPONSE_CACHE_TTL_SECONDS
+
+    with database.get_connection() as conn:
+        row = conn.execute("SELECT response FROM response_cache WHERE cache_key = ? AND created_at >= ?",
+                           (key, min_created)).fetchone()
+        candidates = []
+        if row is None and RESPONSE_CACHE_SEMANTIC:
+            candidates = conn.execute("""
+                SELECT cache_key, response, embedding FROM response_cache
+                WHERE model = ? AND context_hash = ? AND created_at >= ? AND embedding IS NOT NULL
+                ORDER BY last_used_at DESC LIMIT ?
+            """, (model, ctx_hash, min_created, RESPONSE_CACHE_SCAN_LIMIT)).fetchall()
+
+    if row is not None:
+        _touch(key, now)
+        _count("hits")
+        return row[0]
+
+    if candidates:
+        vectors = np.stack([np.frombuffer(c[2], dtype=np.float32) for c in candidates])
+        query = retrieval.embed_query(normalize_question(question))
+        idx, scores = retrieval.top_k(vectors, query, 1)
+        if len(idx) and scores[0] >= RESPONSE_CACHE_SIMILARITY:
+            best = candidates[int(idx[0])]
+            _touch(best[0], now)
+            _count("semantic_hits")
+            return best[1]
+
+    _count("misses")
+    return None
+
+def store(question, model, context, response):
+    """Caches a response and evicts expired or least recently used entries."""
+    now = time.time()
+    ctx_hash = context_hash(context)
+    normalized = normalize_question(question)
+    embedding = None
+    if RESPONSE_CACHE_SEMANTIC:
+        embedding = retrieval.embed_query(normalized).astype(np.float32).tobytes()
+
+    with database.transaction() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO response_cache
+                (cache_key, model, context_hash, question, response, embedding, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (cache_key(question, model, ctx_hash), model, ctx_hash, normalized, response, embedding, now, now))
+        conn.execute("DELETE FROM response_cache WHERE created_at < ?", (now - RESPONSE_CACHE_TTL_SECONDS,))
+        conn.execute("""
+            DELETE FROM response_cache WHERE cache_key IN (
+                SELECT cache_key FROM response_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (RESPONSE_CACHE_MAX_ENTRIES,))
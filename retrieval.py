@@ -0,0 +1,247 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import ann_index
+import embedding_store
+import metrics
+
+# ✅ Retrieval settings (override through environment variables)
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "150"))
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+MAX_CACHED_INDEXES = int(os.getenv("RAG_MAX_CACHED_INDEXES", "8"))
+# ✅ Answer questions asked without a PDF from every uploaded document; off by default, since the
+# corpus is shared by all users and courses
+RAG_CORPUS_FALLBACK = os.getenv("RAG_CORPUS_FALLBACK", "0") == "1"
+
+_model = None
+_model_lock = threading.Lock()
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+# ✅ Striped locks, so two sessions never embed the same document at once
+_build_locks = [threading.Lock() for _ in range(64)]
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-index")
+_indexed = set()
+
+def get_embedding_model():
+    """Loads the local sentence-embedding model once per process."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            _model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+        return _model
+
+def chunk_text(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """Splits text into overlapping chunks, preferring to break on whitespace."""
+    text = text.strip()
+    if not text:
+        return []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            # ✅ Back off to the last whitespace so words are not cut in half
+            split = text.rfind(" ", start + chunk_size // 2, end)
+            split = max(split, text.rfind("\n", start + chunk_size // 2, end))
+            if split > start:
+                end = split
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def embed_texts(texts, batch_size=EMBED_BATCH_SIZE):
+    """Embeds texts in batches and returns an L2-normalized float32 matrix."""
+    model = get_embedding_model()
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(model.embed_documents(texts[i:i + batch_size]))
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return _normalize(np.asarray(vectors, dtype=np.float32))
+
+def embed_query(text):
+    """Embeds a single query and returns an L2-normalized float32 vector."""
+    vector = np.asarray(get_embedding_model().embed_query(text), dtype=np.float32)
+    return _normalize(vector)
+
+def top_k(vectors, query_vector, k=TOP_K):
+    """Returns (indices, scores) of the k rows most similar to the query, best first."""
+    if len(vectors) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    scores = vectors @ query_vector
+    k = min(k, len(scores))
+    idx = np.argpartition(-scores, k - 1)[:k]
+    idx = idx[np.argsort(-scores[idx])]
+    return idx, scores[idx]
+
+class DocumentIndex:
+    """Chunks of one document with their embeddings stacked in a NumPy matrix (possibly memory-mapped).
+
+    A partial index covers the first text_length characters of a document that is still being extracted.
+    """
+
+    def __init__(self, chunks, vectors, text_length=None, complete=True):
+        self.chunks = chunks
+        self.vectors = vectors
+        self.text_length = text_length
+        self.complete = complete
+
+    def search(self, question, k=TOP_K):
+        """Returns the k chunks most similar to the question, best first."""
+        idx, _ = top_k(self.vectors, embed_query(question), k)
+        return [self.chunks[i] for i in idx]
+
+def build_index(text, previous=None):
+    """Chunks and embeds a document, reusing the vectors of a partial index of an earlier prefix of it.
+
+    Chunk boundaries only depend on the text before them, so when pages are appended the leading
+    chunks are unchanged and only the tail has to be embedded.
+    """
+    chunks = chunk_text(text)
+    reuse = 0
+    if previous is not None and not previous.complete:
+        limit = min(len(previous.chunks), len(chunks))
+        while reuse < limit and previous.chunks[reuse] == chunks[reuse]:
+            reuse += 1
+
+    parts = [np.asarray(previous.vectors[:reuse])] if reuse else []
+    if len(chunks) > reuse:
+        parts.append(embed_texts(chunks[reuse:]))
+    vectors = np.concatenate(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+    return DocumentIndex(chunks, vectors, text_length=len(text), complete=False)
+
+def _build_lock(key):
+    return _build_locks[hash(key) % len(_build_locks)]
+
+def _cached_index(key, text):
+    """Returns the in-memory index for key if it covers text, else None."""
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None or not (index.complete or index.text_length >= len(text)):
+            return None
+        _indexes.move_to_end(key)
+        return index
+
+def _remember(key, index):
+    with _indexes_lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
+
+def get_index(text, doc_hash=None):
+    """Returns the index for a document, loading it from the persistent store when possible.
+
+    Uploaded documents are keyed by doc_hash. While their pages are still arriving the index is kept
+    in memory and grown as the text grows; index_document persists it once extraction has finished.
+    Text without a doc_hash is treated as a whole document and keyed by its own hash.
+    """
+    key = doc_hash or hashlib.sha256(text.encode("utf-8")).hexdigest()
+    index = _cached_index(key, text)
+    if index is not None:
+        metrics.record_cache("rag_index", "memory_hit")
+        return index
+
+    with _build_lock(key):
+        # ✅ Another session may have grown or loaded the index while we waited
+        index = _cached_index(key, text)
+        if index is not None:
+            metrics.record_cache("rag_index", "memory_hit")
+            return index
+
+        stored = embedding_store.load(key, EMBEDDING_MODEL_NAME)
+        metrics.record_cache("rag_index", "disk_hit" if stored is not None else "miss")
+        if stored is None:
+            with _indexes_lock:
+                previous = _indexes.get(key)
+            with metrics.span("rag.build_index"):
+                index = build_index(text, previous)
+            if doc_hash is None:
+                embedding_store.save(key, EMBEDDING_MODEL_NAME, index.chunks, index.vectors)
+                # ✅ Reopen from disk so this process also shares the memory-mapped copy
+                stored = embedding_store.load(key, EMBEDDING_MODEL_NAME)
+        if stored is not None:
+            index = DocumentIndex(*stored)
+        _remember(key, index)
+    return index
+
+def _index_document(doc_hash, text):
+    try:
+        with _build_lock(doc_hash):
+            stored = embedding_store.load(doc_hash, EMBEDDING_MODEL_NAME)
+            if stored is None:
+                with _indexes_lock:
+                    previous = _indexes.get(doc_hash)
+                with metrics.span("rag.build_index"):
+                    index = build_index(text, previous)
+                if not index.chunks:
+                    return
+                embedding_store.save(doc_hash, EMBEDDING_MODEL_NAME, index.chunks, index.vectors)
+                stored = embedding_store.load(doc_hash, EMBEDDING_MODEL_NAME)
+            if stored is None:
+                return
+            index = DocumentIndex(*stored)
+            _remember(doc_hash, index)
+        ann_index.add_document(doc_hash, index.vectors)
+    except Exception as e:
+        with _indexes_lock:
+            _indexed.discard(doc_hash)
+        metrics.record_error("rag.index_document")
+        print(f"[retrieval] Indexing failed for {doc_hash[:12]}: {e}")
+
+def index_document(job):
+    """Ingestion callback: embeds and persists a fully extracted document and adds it to the corpus index."""
+    with _indexes_lock:
+        if job.doc_hash in _indexed:
+            return
+        _indexed.add(job.doc_hash)
+    _executor.submit(_index_document, job.doc_hash, job.text())
+
+def retrieve_corpus(question, k=TOP_K):
+    """Returns the most relevant chunks across every ingested document, via the ANN index."""
+    if not ann_index.available():
+        return []
+    hits = ann_index.search(embed_query(question), k)
+    chunks = (embedding_store.get_chunk(doc_hash, chunk_index) for doc_hash, chunk_index, _ in hits)
+    return [chunk for chunk in chunks if chunk is not None]
+
+def retrieve(question, text, k=TOP_K, doc_hash=None):
+    """Returns the chunks of `text` most relevant to the question.
+
+    Without text nothing is retrieved, unless RAG_CORPUS_FALLBACK searches the whole corpus instead.
+    """
+    if not text.strip():
+        return retrieve_corpus(question, k) if RAG_CORPUS_FALLBACK else []
+    # ✅ Short documents fit in the prompt as-is, no need to embed them
+    if len(text) <= CHUNK_SIZE * k:
+        return [text.strip()]
+    return get_index(text, doc_hash).search(question, k)
+
+def representative_chunks(text, k=TOP_K):
+    """Returns k chunks spread evenly across the document, for prompts without a question."""
+    chunks = chunk_text(text)
+    if len(chunks) <= k:
+        return chunks
+    positions = np.linspace(0, len(chunks) - 1, k).round().astype(int)
+    return [chunks[i] for i in positions]
+
+def build_context(question, text, k=TOP_K, doc_hash=None):
+    """Joins the retrieved chunks into a prompt-ready reference block."""
+    return "\n\n---\n\n".join(retrieve(question, text, k, doc_hash))
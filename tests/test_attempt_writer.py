@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import attempt_writer  # noqa: E402
+
+def make_result(n):
+    return (f"user{n}", 1, 1, [("Question?", "A", "A")], "2024-01-01 00:00:00", "general")
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+def test_every_batch_is_flushed_on_the_interval(monkeypatch):
+    written = []
+    monkeypatch.setattr(attempt_writer.database, "save_quiz_results", lambda batch: written.extend(batch))
+    queue = attempt_writer.WriteBehindQueue(flush_size=500, flush_interval=0.1)
+
+    queue.submit(make_result(1))
+    assert wait_until(lambda: len(written) == 1)
+    # A later submission, after the writer has gone idle, must not wait for a full batch
+    queue.submit(make_result(2))
+    assert wait_until(lambda: len(written) == 2)
+    assert queue.pending() == 0
+
+def test_full_batch_is_flushed_immediately(monkeypatch):
+    written = []
+    monkeypatch.setattr(attempt_writer.database, "save_quiz_results", lambda batch: written.extend(batch))
+    queue = attempt_writer.WriteBehindQueue(flush_size=3, flush_interval=60)
+
+    for n in range(3):
+        queue.submit(make_result(n))
+    assert wait_until(lambda: len(written) == 3)
+
+def test_failed_flush_is_counted_and_retried(monkeypatch):
+    written = []
+    failures = [OSError("database is locked")]
+
+    def save(batch):
+        if failures:
+            raise failures.pop()
+        written.extend(batch)
+
+    monkeypatch.setattr(attempt_writer.database, "save_quiz_results", save)
+    attempt_writer.metrics.reset()
+    queue = attempt_writer.WriteBehindQueue(flush_size=1, flush_interval=0.05)
+
+    queue.submit(make_result(1))
+    assert wait_until(lambda: len(written) == 1)
+    counters = attempt_writer.metrics.snapshot()["counters"]
+    assert {"name": "background_errors_total", "labels": {"task": "attempt_writer.flush"}, "value": 1} in counters
@@ -0,0 +1,31 @@
+import os
+import sys
+import json
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quiz_generator  # noqa: E402
+
+def make_question(n):
+    return {"question": f"Question {n}?", "options": ["A) one", "B) two", "C) three", "D) four"], "answer": "B) two"}
+
+def test_duplicates_across_sections_are_topped_up(monkeypatch):
+    lock = threading.Lock()
+    calls = []
+
+    def fake_questions(section, count):
+        # Every section's first request repeats the same questions; later ones return new ones
+        with lock:
+            calls.append(count)
+            start = 0 if len(calls) <= 2 else 100 * len(calls)
+        return json.dumps([make_question(start + i) for i in range(count)])
+
+    monkeypatch.setattr(quiz_generator.ai, "get_quiz_questions", fake_questions)
+    monkeypatch.setattr(quiz_generator, "QUIZ_SECTION_CHARS", 100)
+    text = " ".join(f"word{i}" for i in range(200))
+
+    questions = quiz_generator.generate_questions(text, num_questions=10)
+    assert len(questions) == 10
+    assert len({q["question"] for q in questions}) == 10
+    assert calls[:2] == [5, 5]
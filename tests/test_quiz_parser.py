@@ -0,0 +1,30 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quiz_parser import IncrementalQuestionParser, parse_questions  # noqa: E402
+
+def make_question(n):
+    return {"question": f"Question {n}?", "options": ["A) one", "B) two", "C) three", "D) four"], "answer": "B) two"}
+
+def test_questions_inside_wrapper_object():
+    text = json.dumps({"questions": [make_question(1), make_question(2)]})
+    assert parse_questions(text) == [make_question(1), make_question(2)]
+
+def test_wrapper_questions_are_returned_while_streaming():
+    text = json.dumps({"quiz": {"questions": [make_question(1), make_question(2)]}})
+    cut = text.index(json.dumps(make_question(2)))
+    parser = IncrementalQuestionParser()
+    assert parser.feed(text[:cut]) == [make_question(1)]
+    assert parser.feed(text[cut:], final=True) == [make_question(2)]
+
+def test_truncated_array_keeps_complete_questions():
+    text = json.dumps([make_question(1), make_question(2), make_question(3)])
+    truncated = text[:text.index("Question 3") + 5]
+    assert parse_questions(truncated) == [make_question(1), make_question(2)]
+
+def test_braces_inside_strings_do_not_split_objects():
+    question = dict(make_question(1), question="Which set is {1, 2}?")
+    assert parse_questions(json.dumps({"questions": [question]})) == [question]
@@ -1,42 +1,72 @@
 import os
-import json
-import fitz  # PyMuPDF for PDF processing
 import streamlit as st
+import metrics
+import pdf_cache
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def load_users(user_file="users.json"):
-    """Load users from a JSON file."""
-    if os.path.exists(user_file):
-        with open(user_file, "r") as f:
-            return json.load(f)
-    return {}
+def read_uploaded_bytes(uploaded_file):
+    """Returns the raw bytes of an uploaded file without consuming its stream."""
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    return uploaded_file.read()
 
-def save_users(users, user_file="users.json"):
-    """Save users to a JSON file."""
-    with open(user_file, "w") as f:
-        json.dump(users, f, indent=4)
+def extract_pages_from_pdf(uploaded_file):
+    """Extracts per-page text from an uploaded PDF, reusing the on-disk cache."""
+    if uploaded_file is None:
+        return []
 
+    data = read_uploaded_bytes(uploaded_file)
+    doc_hash = pdf_cache.document_hash(data)
+
+    pages = pdf_cache.load_pages(doc_hash)
+    metrics.record_cache("pdf_text", "hit" if pages is not None else "miss")
+    if pages is None:
+        import pdf_extract  # ✅ Deferred: pulls in PyMuPDF, which the entry point should not pay for
+        pages = pdf_extract.extract_pages(data)
+        pdf_cache.save_pages(doc_hash, pages)
+    return pages
+
+@metrics.timed("pdf.extract_text")
 def extract_text_from_pdf(uploaded_file):
     """Extracts text from an uploaded PDF file."""
-    text = ""
-    if uploaded_file is not None:
-        with fitz.open(stream=uploaded_file.read(), filetype="pdf") as doc:
-            for page in doc:
-                text += page.get_text("text") + "\n"
-    return text
-
-# ✅ Streamlit File Uploader
-uploaded_pdf = st.file_uploader("📂 Upload a PDF", type=["pdf"])
-
-if uploaded_pdf:
-    pdf_text = extract_text_from_pdf(uploaded_pdf)
-    st.session_state["pdf_text"] = pdf_text  # Store in session state
-    st.success(f"✅ PDF '{uploaded_pdf.name}' uploaded successfully!")
-    st.write("📄 Extracted Text Preview:")
-    st.text_area("Extracted Text", pdf_text[:500], height=200)
+    return "".join(page + "\n" for page in extract_pages_from_pdf(uploaded_file))
+
+def ingest_uploaded_pdf(uploaded_file):
+    """Starts background extraction and waits only for the first few pages."""
+    import pdf_ingest
+    import quiz_pool  # ✅ Deferred: pulls in the LLM client and embedding stack
+    import retrieval
+
+    # ✅ A new upload (not a rerun with the same one) retries a document whose extraction failed
+    upload_id = getattr(uploaded_file, "file_id", None)
+    retry = upload_id != st.session_state.get("pdf_upload_id")
+    st.session_state["pdf_upload_id"] = upload_id
+    job = pdf_ingest.start_ingestion(read_uploaded_bytes(uploaded_file), retry=retry)
+    job.wait_for_pages(pdf_ingest.PDF_EARLY_PAGES)
+    # ✅ Pre-generate quiz questions in the background once the whole document is available
+    job.add_done_callback(quiz_pool.prefill)
+    # ✅ Embed and persist the document once, from the full text, and add it to the corpus index
+    job.add_done_callback(retrieval.index_document)
+    # ✅ The session keeps only the document hash; the text itself is shared across sessions
+    st.session_state["pdf_hash"] = job.doc_hash
+    return job
+
+def current_pdf_job():
+    """Returns the ingestion job for the session's document, or None if nothing is uploaded."""
+    doc_hash = st.session_state.get("pdf_hash")
+    if not doc_hash:
+        return None
+    import pdf_ingest
+
+    return pdf_ingest.get_job(doc_hash)
+
+def get_pdf_text():
+    """Returns the text extracted so far from the session's document ("" if none)."""
+    job = current_pdf_job()
+    return job.text() if job is not None else ""
 
 def initialize_session_keys():
     """Ensure all session state keys are initialized."""